@@ -1,11 +1,34 @@
 import streamlit as st
-import firebase_admin
-from firebase_admin import credentials, firestore, storage
+import numpy as np
 import pandas as pd
-from datetime import datetime, time
-import requests
-import folium
-from streamlit_folium import st_folium
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time, timedelta
+from time import perf_counter
+from uuid import uuid4
+
+from event_html import cached_popup_html, cards_html, html_cache
+from event_store import (
+    EventSnapshot,
+    delete_events,
+    fetch_events_page,
+    fetch_public_events,
+    public_window_start,
+    set_approved,
+)
+from facets import FacetIndex
+from firebase_client import init_db
+from interval_index import IntervalIndex
+from metering import FirestoreMeter, MeteredFirestore
+from normalize import DISPLAY_FORMAT, local_now, normalize_events
+from perf import PerfRecorder
+from replica import DEFAULT_REPLICA_PATH, EventReplica
+from search_index import SearchIndex
+from spatial_index import GridIndex, viewport_box
+from submissions import SubmissionError, parse_event_times
+
+# folium / streamlit_folium (map tab), geocoding + requests, Pillow and
+# firebase_admin.storage (form tab) are imported where they are first used,
+# so tabs that don't need them don't pay for loading them.
 
 # -------------------------------------------------
 # PAGE CONFIG
@@ -102,32 +125,171 @@ st.session_state.setdefault("_js_message", None)
 # -------------------------------------------------
 # FIREBASE INIT
 # -------------------------------------------------
-firebase_config = st.secrets["firebase"]
-
-if not firebase_admin._apps:
-    cred = credentials.Certificate(
-        {
-            "type": firebase_config["type"],
-            "project_id": firebase_config["project_id"],
-            "private_key_id": firebase_config["private_key_id"],
-            "private_key": firebase_config["private_key"],
-            "client_email": firebase_config["client_email"],
-            "client_id": firebase_config["client_id"],
-            "auth_uri": firebase_config["auth_uri"],
-            "token_uri": firebase_config["token_uri"],
-            "auth_provider_x509_cert_url": firebase_config["auth_provider_x509_cert_url"],
-            "client_x509_cert_url": firebase_config["client_x509_cert_url"],
-            "universe_domain": firebase_config.get("universe_domain", "googleapis.com"),
-        }
-    )
-    firebase_admin.initialize_app(
-        cred,
-        {
-            "storageBucket": "maistiaisetmap-images",
-        },
-    )
+# "firestore" (default), "emulator" or "fake" (offline). Set with [backend] mode.
+BACKEND_MODE = st.secrets.get("backend", {}).get("mode", "firestore")
+
+# Reads one browser session may cause itself (admin queue pages) before it
+# is only shown the pages it already fetched. 0 = no limit. Override with
+# [metering] session_read_budget.
+#
+# Public views are not budgeted per session: they read the shared snapshot,
+# whose loads are metered as "shared" and happen at most once per
+# [cache] events_ttl_seconds (and with the replica, only changed docs are
+# read). That TTL is the process-wide cap on public reads.
+SESSION_READ_BUDGET = st.secrets.get("metering", {}).get("session_read_budget", 5000)
+
+
+@st.cache_resource
+def get_meter():
+    """Firestore read/write counters, shared by all sessions."""
+    return FirestoreMeter()
+
+
+@st.cache_resource
+def get_db():
+    """Firestore (or emulator/fake) client, built once per process.
+
+    Wrapped so every read and write made through it is metered.
+    """
+    return MeteredFirestore(init_db(st.secrets), get_meter())
+
+
+# Calls made during this rerun are charged to this session (background
+# threads — listener, workers, archiver — count as "background", shared
+# snapshot loads as "shared"; see metering.py)
+meter = get_meter()
+st.session_state.setdefault("session_id", uuid4().hex)
+rerun_usage = meter.start_rerun(st.session_state["session_id"])
+over_read_budget = meter.over_budget(st.session_state["session_id"], SESSION_READ_BUDGET)
+
+db = get_db()
+
+
+# -------------------------------------------------
+# PERFORMANCE SPANS (shown in the admin tab)
+# -------------------------------------------------
+@st.cache_resource
+def get_perf():
+    """Rolling per-stage timings, shared by all sessions."""
+    return PerfRecorder()
 
-db = firestore.client()
+
+perf = get_perf()
+rerun_started = perf_counter()
+
+# -------------------------------------------------
+# SHARED EVENT CACHE
+# -------------------------------------------------
+# Seconds before the shared snapshot is refetched from Firestore.
+# Override with [cache] events_ttl_seconds in secrets.toml.
+EVENTS_CACHE_TTL = st.secrets.get("cache", {}).get("events_ttl_seconds", 60)
+
+# Days before today whose already-ended events are still listed publicly.
+PUBLIC_LOOKBACK_DAYS = st.secrets.get("cache", {}).get("public_lookback_days", 0)
+
+# Public views read a local SQLite mirror instead of querying Firestore.
+# A snapshot listener keeps it current; backends without listeners get a
+# full re-sync every [replica] sync_seconds. [replica] enabled = false
+# goes back to querying Firestore directly.
+REPLICA_ENABLED = st.secrets.get("replica", {}).get("enabled", True)
+REPLICA_PATH = st.secrets.get("replica", {}).get("path", DEFAULT_REPLICA_PATH)
+REPLICA_SYNC_SECONDS = st.secrets.get("replica", {}).get("sync_seconds", 3600)
+
+
+@st.cache_resource
+def get_replica():
+    """SQLite read replica of the events collection (None when disabled)."""
+    if not REPLICA_ENABLED:
+        return None
+    # The fake backend lives in memory, so its mirror does too
+    replica = EventReplica(":memory:" if BACKEND_MODE == "fake" else REPLICA_PATH)
+    replica.watch(db)
+    return replica
+
+
+@st.cache_resource
+def get_public_snapshot():
+    """Approved, current/upcoming events — shared by all sessions.
+
+    Read from the local replica when enabled, else queried server-side.
+    Its Firestore reads are metered as "shared", not against the session
+    whose rerun happened to find it expired.
+    """
+    def load():
+        since = public_window_start(PUBLIC_LOOKBACK_DAYS)
+        replica = get_replica()
+        if replica is None:
+            with perf.span("firestore_fetch") as sizes, meter.shared():
+                docs = fetch_public_events(db, since)
+                sizes["rows"] = len(docs)
+            return docs
+
+        with perf.span("replica_sync"), meter.shared():
+            replica.ensure_synced(db, REPLICA_SYNC_SECONDS)
+        with perf.span("replica_read") as sizes:
+            docs = replica.public_events(since)
+            sizes["rows"] = len(docs)
+        return docs
+
+    def prepare(df):
+        with perf.span("normalize", rows=0 if df is None else len(df)):
+            return normalize_events(df)
+
+    return EventSnapshot(load, ttl_seconds=EVENTS_CACHE_TTL, prepare=prepare)
+
+
+# "cluster" (one client-side clustered layer) or "markers" (legacy per-event
+# CircleMarker + IFrame popups). Override with [map] render_mode.
+MAP_RENDER_MODE = st.secrets.get("map", {}).get("render_mode", "cluster")
+
+# Cluster mode only: with lazy popups the map ships just an id per marker and
+# the clicked event's card is rendered below the map. Override with
+# [map] lazy_popups = false to embed every popup in the page.
+MAP_LAZY_POPUPS = st.secrets.get("map", {}).get("lazy_popups", True)
+
+# Extra area loaded around the visible map, as a fraction of its width/height
+MAP_VIEWPORT_MARGIN = st.secrets.get("map", {}).get("viewport_margin", 0.25)
+
+# Public URL of the folder holding static/events/manifest.json (see
+# static_export.py). When set, the map loads its markers from those CDN files
+# in the browser instead of embedding them. Override with [map] static_base_url,
+# e.g. "https://storage.googleapis.com/maistiaisetmap-images/static/events".
+MAP_STATIC_BASE_URL = st.secrets.get("map", {}).get("static_base_url", "").rstrip("/")
+
+# Days of static files loaded from the first day of the date filter.
+MAP_STATIC_DAYS = st.secrets.get("map", {}).get("static_days", 7)
+
+# Republish the static files after admin approvals/deletions.
+STATIC_PUBLISH = st.secrets.get("map", {}).get(
+    "static_publish", bool(MAP_STATIC_BASE_URL) and BACKEND_MODE == "firestore"
+)
+
+# Event cards per list page. Override with [list] page_size.
+LIST_PAGE_SIZE = st.secrets.get("list", {}).get("page_size", 20)
+
+# "Starting soon" window of the time filter. Override with [list] soon_hours.
+SOON_HOURS = st.secrets.get("list", {}).get("soon_hours", 3)
+
+# Expired events are moved to the events_archive collection (or to the
+# [archive] file, a .jsonl.gz) once a day, retention_days after they ended.
+# [archive] auto = false turns the daily job off; `python archive.py run`
+# does the same from cron.
+ARCHIVE_AUTO = st.secrets.get("archive", {}).get("auto", True)
+ARCHIVE_RETENTION_DAYS = st.secrets.get("archive", {}).get("retention_days", 30)
+ARCHIVE_FILE = st.secrets.get("archive", {}).get("file")
+
+# Rows per page in the admin moderation queue. Override with [admin] page_size.
+ADMIN_PAGE_SIZE = st.secrets.get("admin", {}).get("page_size", 50)
+
+# st_folium widget key; its last bounds/zoom/center live in session_state
+MAP_KEY = "events_map"
+
+# Marker row sets (one per data version, filters and language) kept for reuse
+# across reruns and sessions; panning only re-selects the visible rows.
+# Override with [map] cache_size.
+MAP_CACHE_SIZE = st.secrets.get("map", {}).get("cache_size", 32)
+
+public_snapshot = get_public_snapshot()
 
 # -------------------------------------------------
 # TRANSLATIONS
@@ -158,8 +320,11 @@ translations = {
         "pending": "Odottaa hyväksyntää",
 
         "create_event": "Luo tapahtuma",
+        "submission_pending": "Tapahtumaa tallennetaan…",
         "no_events": "Ei tapahtumia listattavaksi.",
         "no_events_map": "Ei tapahtumia kartalla.",
+        "static_filters_note": "Kartalla rajataan vain päivämäärillä. Haku, muut suodattimet ja \"Lähelläni\" ovat Lista-välilehdellä.",
+        "static_days_capped": "Kartalla näytetään enintään {n} päivää kerrallaan, joten {date} jälkeiset tapahtumat eivät ole kartalla. Valitse myöhempi alkupäivä nähdäksesi ne.",
 
         "login_title": "Admin kirjautuminen",
         "password": "Salasana",
@@ -168,13 +333,50 @@ translations = {
         "admin_panel": "Admin-paneeli",
         "approve_button": "Hyväksy",
         "approved_msg": "Hyväksytty!",
+        "admin_queue": "Jono",
+        "select": "Valitse",
+        "select_all": "Valitse kaikki tällä sivulla",
+        "approve_selected": "Hyväksy valitut ({n})",
+        "delete_selected": "Poista valitut ({n})",
+        "deleted_msg": "Poistettu!",
+        "perf_title": "Suorituskyky",
+        "perf_empty": "Ei mittauksia vielä.",
+        "perf_reset": "Nollaa mittaukset",
+        "usage_title": "Firestore-käyttö",
+        "usage_total": "Lukuja / kirjoituksia yhteensä",
+        "usage_5min": "Viim. 5 min",
+        "usage_session": "Tämä istunto",
+        "usage_budget": "Lukubudjetti istuntoa kohden: {n}",
+        "budget_exceeded": "Lukubudjetti on käytetty — näytetään välimuistissa olevat tiedot.",
+        "archive_title": "Arkisto",
+        "archive_now": "Arkistoi päättyneet nyt",
+        "archive_status": "Viimeksi {when}: {n} tapahtumaa arkistoitu",
 
         "filters_title": "Suodata tapahtumia",
+        "search": "Hae",
+        "search_placeholder": "esim. kahvi, kaurajogurtti, Prisma",
         "filter_brand": "Brändi",
         "filter_store": "Myymälä",
         "filter_from": "Alkaen",
         "filter_to": "Päättyen",
         "filter_clear": "Tyhjennä suodattimet",
+
+        "prev_page": "← Edellinen",
+        "next_page": "Seuraava →",
+        "page_of": "Sivu {page}/{pages} · {total} tapahtumaa",
+
+        "when": "Milloin",
+        "when_any": "Kaikki",
+        "when_now": "Käynnissä nyt",
+        "when_soon": "Alkaa {hours} h sisällä",
+
+        "near_title": "Lähelläni",
+        "near_query": "Paikka tai osoite",
+        "near_radius": "Säde (km)",
+        "near_not_found": "Paikkaa ei löytynyt.",
+        "sort_by": "Järjestys",
+        "sort_distance": "Etäisyys",
+        "sort_time": "Aika",
     },
 
     "en": {
@@ -202,8 +404,11 @@ translations = {
         "pending": "Pending approval",
 
         "create_event": "Create Event",
+        "submission_pending": "Saving your event…",
         "no_events": "No events available.",
         "no_events_map": "No events on the map.",
+        "static_filters_note": "The map filters by date only. Search, the other filters and \"Near me\" are on the List tab.",
+        "static_days_capped": "The map shows at most {n} days at a time, so events after {date} are not on the map. Pick a later start date to see them.",
 
         "login_title": "Admin Login",
         "password": "Password",
@@ -212,13 +417,50 @@ translations = {
         "admin_panel": "Admin Panel",
         "approve_button": "Approve",
         "approved_msg": "Approved!",
+        "admin_queue": "Queue",
+        "select": "Select",
+        "select_all": "Select all on this page",
+        "approve_selected": "Approve selected ({n})",
+        "delete_selected": "Delete selected ({n})",
+        "deleted_msg": "Deleted!",
+        "perf_title": "Performance",
+        "perf_empty": "No measurements yet.",
+        "perf_reset": "Reset measurements",
+        "usage_title": "Firestore usage",
+        "usage_total": "Reads / writes total",
+        "usage_5min": "Last 5 min",
+        "usage_session": "This session",
+        "usage_budget": "Read budget per session: {n}",
+        "budget_exceeded": "Read budget used up — showing cached data.",
+        "archive_title": "Archive",
+        "archive_now": "Archive expired events now",
+        "archive_status": "Last run {when}: {n} event(s) archived",
 
         "filters_title": "Filter events",
+        "search": "Search",
+        "search_placeholder": "e.g. oat yogurt, coffee, Prisma",
         "filter_brand": "Brand",
         "filter_store": "Store",
         "filter_from": "From date",
         "filter_to": "To date",
         "filter_clear": "Clear filters",
+
+        "prev_page": "← Previous",
+        "next_page": "Next →",
+        "page_of": "Page {page}/{pages} · {total} events",
+
+        "when": "When",
+        "when_any": "Any time",
+        "when_now": "Happening now",
+        "when_soon": "Starting within {hours} h",
+
+        "near_title": "Near me",
+        "near_query": "Place or address",
+        "near_radius": "Radius (km)",
+        "near_not_found": "Could not find that place.",
+        "sort_by": "Sort by",
+        "sort_distance": "Distance",
+        "sort_time": "Time",
     },
 
     "sv": {
@@ -246,8 +488,11 @@ translations = {
         "pending": "Väntar på godkännande",
 
         "create_event": "Skapa Evenemang",
+        "submission_pending": "Evenemanget sparas…",
         "no_events": "Inga evenemang att visa.",
         "no_events_map": "Inga evenemang på kartan.",
+        "static_filters_note": "Kartan filtreras bara på datum. Sökning, övriga filter och \"Nära mig\" finns på fliken Lista.",
+        "static_days_capped": "Kartan visar högst {n} dagar åt gången, så evenemang efter {date} syns inte på kartan. Välj ett senare startdatum för att se dem.",
 
         "login_title": "Admin inloggning",
         "password": "Lösenord",
@@ -256,13 +501,50 @@ translations = {
         "admin_panel": "Adminpanel",
         "approve_button": "Godkänn",
         "approved_msg": "Godkänd!",
+        "admin_queue": "Kö",
+        "select": "Välj",
+        "select_all": "Välj alla på sidan",
+        "approve_selected": "Godkänn valda ({n})",
+        "delete_selected": "Radera valda ({n})",
+        "deleted_msg": "Raderad!",
+        "perf_title": "Prestanda",
+        "perf_empty": "Inga mätningar än.",
+        "perf_reset": "Nollställ mätningar",
+        "usage_title": "Firestore-användning",
+        "usage_total": "Läsningar / skrivningar totalt",
+        "usage_5min": "Senaste 5 min",
+        "usage_session": "Denna session",
+        "usage_budget": "Läsbudget per session: {n}",
+        "budget_exceeded": "Läsbudgeten är förbrukad — visar cachad data.",
+        "archive_title": "Arkiv",
+        "archive_now": "Arkivera utgångna nu",
+        "archive_status": "Senast {when}: {n} evenemang arkiverade",
 
         "filters_title": "Filtrera evenemang",
+        "search": "Sök",
+        "search_placeholder": "t.ex. kaffe, havreyoghurt, Prisma",
         "filter_brand": "Varumärke",
         "filter_store": "Butik",
         "filter_from": "Från datum",
         "filter_to": "Till datum",
         "filter_clear": "Rensa filter",
+
+        "prev_page": "← Föregående",
+        "next_page": "Nästa →",
+        "page_of": "Sida {page}/{pages} · {total} evenemang",
+
+        "when": "När",
+        "when_any": "När som helst",
+        "when_now": "Pågår nu",
+        "when_soon": "Börjar inom {hours} h",
+
+        "near_title": "Nära mig",
+        "near_query": "Plats eller adress",
+        "near_radius": "Radie (km)",
+        "near_not_found": "Platsen hittades inte.",
+        "sort_by": "Sortera efter",
+        "sort_distance": "Avstånd",
+        "sort_time": "Tid",
     },
 }
 
@@ -314,405 +596,511 @@ if active != st.session_state["active_tab"]:
 st.markdown("<div style='margin-bottom:6px;'></div>", unsafe_allow_html=True)
 
 # -------------------------------------------------
-# DATE/TIME HELPERS
+# BACKGROUND RESOURCES (geocoder, image pool, submission worker)
 # -------------------------------------------------
-def to_datetime(val):
-    """Best-effort conversion of Firestore Timestamp / string → datetime."""
-    if val is None or val == "":
-        return None
-    if isinstance(val, datetime):
-        return val
-    if hasattr(val, "to_datetime"):
-        try:
-            return val.to_datetime()
-        except Exception:
-            pass
-    try:
-        return pd.to_datetime(val)
-    except Exception:
-        return None
+@st.cache_resource
+def get_geocoder():
+    """One cached, rate-limited geocoder per process (see geocoding.py)."""
+    from geocoding import DEFAULT_CACHE_PATH, NOMINATIM_URL, GeocodeCache, Geocoder, NominatimBackend
+
+    cfg = st.secrets.get("geocoding", {})
+    return Geocoder(
+        backend=NominatimBackend(base_url=cfg.get("base_url", NOMINATIM_URL)),
+        cache=GeocodeCache(cfg.get("cache_path", DEFAULT_CACHE_PATH)),
+    )
 
 
-def format_dt_eu(val):
-    """Return DD-MM-YYYY HH:MM or empty string."""
-    dt = to_datetime(val)
-    if dt is None or pd.isna(dt):
-        return ""
-    return dt.strftime("%d-%m-%Y %H:%M")
+@st.cache_resource
+def get_image_pool():
+    """Worker threads for encoding image variants (Pillow releases the GIL)."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="images")
 
 
-def to_date(val):
-    """Return date() from datetime-like, or None."""
-    dt = to_datetime(val)
-    if dt is None or pd.isna(dt):
-        return None
-    return dt.date()
-# -------------------------------------------------
-# FILTER HELPERS (FINAL – KEEP ALL COLUMNS)
-# -------------------------------------------------
-def apply_filters(df: pd.DataFrame) -> pd.DataFrame:
-    """Filter events by brand, store, and date — without dropping columns."""
-    if df is None or df.empty:
-        return df
+@st.cache_resource
+def get_submission_worker():
+    """Background worker that geocodes, writes and uploads form submissions."""
+    from submission_worker import SubmissionWorker
 
-    df = df.copy()
+    bucket = None
+    if BACKEND_MODE == "firestore":
+        from firebase_admin import storage
 
-    # Extract clean date columns (for filtering)
-    df["start_date_clean"] = df["start_time"].apply(to_date)
-    df["end_date_clean"] = df["end_time"].apply(to_date)
+        bucket = storage.bucket()
 
-    # Dropdown values
-    brands = sorted([b for b in df.get("brand_id", []).dropna().unique() if b])
-    stores = sorted([s for s in df.get("store_name", []).dropna().unique() if s])
+    return SubmissionWorker(
+        db,
+        bucket,
+        get_geocoder(),
+        image_pool=get_image_pool(),
+    )
 
-    st.markdown(f"### {T['filters_title']}")
 
-    c1, c2 = st.columns(2)
-    brand = c1.selectbox(T["filter_brand"], [""] + brands)
-    store = c2.selectbox(T["filter_store"], [""] + stores)
+@st.cache_resource
+def get_static_publisher():
+    """Background job writing the static GeoJSON files to Storage (see static_export.py)."""
+    from firebase_admin import storage
+    from static_export import BucketSink, StaticPublisher
 
-    valid_starts = df["start_date_clean"].dropna()
-    valid_ends = df["end_date_clean"].dropna()
+    return StaticPublisher(BucketSink(storage.bucket()))
 
-    today = datetime.today().date()
-    min_date = valid_starts.min() if not valid_starts.empty else today
-    max_date = valid_ends.max() if not valid_ends.empty else today
 
-    c3, c4, c5 = st.columns([1, 1, 0.7])
-    date_from = c3.date_input(T["filter_from"], value=min_date)
-    date_to = c4.date_input(T["filter_to"], value=max_date)
+@st.cache_data(ttl=60, show_spinner=False)
+def load_static_manifest(base_url):
+    """manifest.json of the published static files (None if unreachable)."""
+    import requests
 
-    if c5.button(T["filter_clear"]):
-        st.rerun()
+    try:
+        resp = requests.get(f"{base_url}/manifest.json", timeout=5)
+        resp.raise_for_status()
+        return resp.json()
+    except (requests.RequestException, ValueError):
+        return None
 
-    f = df.copy()
-    if brand:
-        f = f[f["brand_id"] == brand]
-    if store:
-        f = f[f["store_name"] == store]
-    if date_from:
-        f = f[f["end_date_clean"] >= date_from]
-    if date_to:
-        f = f[f["start_date_clean"] <= date_to]
 
-    st.markdown("<div style='margin-bottom:4px;'></div>", unsafe_allow_html=True)
-    return f
+@st.cache_resource
+def get_archiver():
+    """Daily archival of expired events (None when [archive] auto = false)."""
+    if not ARCHIVE_AUTO:
+        return None
+    from archive import ArchiveScheduler
 
+    return ArchiveScheduler(db, ARCHIVE_RETENTION_DAYS, archive_path=ARCHIVE_FILE)
 
-# -------------------------------------------------
-# FETCH EVENTS + INCLUDE FIRESTORE DOC IDS
-# -------------------------------------------------
-events_raw = db.collection("events").stream()
 
-events_list = []
-for e in events_raw:
-    doc = e.to_dict()
-    doc["id"] = e.id            # <-- Firestore doc ID added
-    events_list.append(doc)
+@st.cache_resource
+def get_map_cache():
+    """Process-wide LRU of map marker rows (the folium.Map itself is rebuilt every rerun)."""
+    from lru import LruCache
 
-events_df = pd.DataFrame(events_list)
+    return LruCache(maxsize=MAP_CACHE_SIZE)
 
-# Only approved events appear publicly
-if not events_df.empty and "approved" in events_df.columns:
-    events_public = events_df[events_df["approved"] == True].copy()
-else:
-    events_public = events_df.copy()
+
+@st.cache_resource
+def get_search_index():
+    """Process-wide full-text index over the public events (see search_index.py)."""
+    return SearchIndex()
+
+
+# Starts the daily job on the first run of the process
+archiver = get_archiver()
 
 
 # -------------------------------------------------
-# NORMALIZE FIELDS (NO TYPE DAMAGE)
+# FILTER HELPERS (FINAL – KEEP ALL COLUMNS)
 # -------------------------------------------------
-def fix_datetime(v):
-    """Convert Firestore Timestamp or string to datetime."""
-    if v is None or v == "":
-        return None
-    if hasattr(v, "to_datetime"):
-        try:
-            return v.to_datetime()
-        except:
-            pass
-    try:
-        return pd.to_datetime(v)
-    except:
-        return None
+FILTER_KEYS = ("f_brand", "f_store", "f_city", "f_from", "f_to", "f_when")
 
-def normalize_events(df):
-    if df.empty:
-        return df
 
-    df = df.copy()
+def _clear_filters():
+    for key in FILTER_KEYS + ("search_query",):
+        st.session_state.pop(key, None)
 
-    # preserve image_url, lat, lon, strings etc.
-    if "start_time" in df:
-        df["start_dt"] = df["start_time"].apply(fix_datetime)
-    if "end_time" in df:
-        df["end_dt"] = df["end_time"].apply(fix_datetime)
 
-    # derived EU formats for map/list
-    df["start_fmt"] = df["start_dt"].apply(
-        lambda x: x.strftime("%d-%m-%Y %H:%M") if x else ""
-    )
-    df["end_fmt"] = df["end_dt"].apply(
-        lambda x: x.strftime("%d-%m-%Y %H:%M") if x else ""
-    )
+def _facet_label(counts):
+    return lambda v: f"{v} ({counts.get(v, 0)})" if v else ""
 
-    # clean date-only fields for filters
-    df["start_date_clean"] = df["start_dt"].apply(lambda x: x.date() if x else None)
-    df["end_date_clean"] = df["end_dt"].apply(lambda x: x.date() if x else None)
 
-    return df
+def apply_filters(view) -> pd.DataFrame:
+    """Filter events by search text, brand, store, city and date — without dropping columns.
 
-events_clean = normalize_events(events_public)
+    `view` is the (version, frame) pair from public_snapshot.view(). Dropdown
+    values and counts come from the FacetIndex built once per snapshot
+    version; each dropdown counts the events left by all *other* filters,
+    like a shop's faceted search.
+    """
+    version, df = view
+    if df is None or df.empty:
+        return df
 
-# -------------------------------------------------
-# APPLY FILTERS
-# -------------------------------------------------
-filtered_df = apply_filters(events_clean.copy())
+    facets = public_snapshot.derived("facets", FacetIndex.from_frame, view)
+
+    today = local_now().date()
+    min_date = facets.min_date or today
+    max_date = facets.max_date or today
+
+    # Widget values of this run (widgets are drawn below, after the counts)
+    query = st.session_state.get("search_query", "")
+    brand = st.session_state.get("f_brand", "")
+    store = st.session_state.get("f_store", "")
+    city = st.session_state.get("f_city", "")
+    date_from = st.session_state.get("f_from", min_date)
+    date_to = st.session_state.get("f_to", max_date)
+
+    when = st.session_state.get("f_when", "any")
+
+    # Time window first: binary searches on the interval index
+    intervals = public_snapshot.derived("intervals", IntervalIndex.from_frame, view)
+    base = intervals.on_days(date_from or min_date, date_to or max_date)
+
+    now = local_now()
+    if when == "now":
+        base = np.intersect1d(base, intervals.live_at(now), assume_unique=True)
+    elif when == "soon":
+        base = np.intersect1d(base, intervals.starting_within(now, SOON_HOURS), assume_unique=True)
+
+    if query.strip():
+        index = get_search_index()
+        index.sync(version, df)
+        ids = index.search(query)
+        if ids is not None:
+            base = np.intersect1d(base, facets.positions_of(ids), assume_unique=True)
+
+    selected = {"brand_id": brand, "store_name": store, "city": city}
+    for (field, value), key in zip(selected.items(), FILTER_KEYS):
+        if value and value not in facets.totals[field]:
+            # Picked value vanished from the data (deleted/expired event)
+            selected[field] = ""
+            st.session_state.pop(key, None)
+
+    def narrowed(skip=None):
+        pos = base
+        for field, value in selected.items():
+            if field != skip:
+                pos = facets.restrict(pos, field, value)
+        return pos
+
+    def options(field):
+        counts = facets.counts(field, narrowed(skip=field))
+        values = [v for v in facets.values[field] if v in counts or v == selected[field]]
+        return [""] + values, _facet_label(counts)
+
+    st.markdown(f"### {T['filters_title']}")
+
+    # Free-text search (inverted index, synced once per snapshot version)
+    st.text_input(T["search"], key="search_query", placeholder=T["search_placeholder"])
+
+    c1, c2, c3 = st.columns(3)
+    for col, label, key, field in (
+        (c1, T["filter_brand"], "f_brand", "brand_id"),
+        (c2, T["filter_store"], "f_store", "store_name"),
+        (c3, T["city"], "f_city", "city"),
+    ):
+        values, label_of = options(field)
+        col.selectbox(label, values, key=key, format_func=label_of)
+
+    c4, c5, c6 = st.columns([1, 1, 0.7])
+    c4.date_input(T["filter_from"], value=min_date, key="f_from")
+    c5.date_input(T["filter_to"], value=max_date, key="f_to")
+    c6.button(T["filter_clear"], on_click=_clear_filters)
+
+    st.radio(
+        T["when"],
+        ["any", "now", "soon"],
+        format_func=lambda k: T[f"when_{k}"].format(hours=SOON_HOURS),
+        horizontal=True,
+        key="f_when",
+    )
+
+    st.markdown("<div style='margin-bottom:4px;'></div>", unsafe_allow_html=True)
+    return df.iloc[narrowed()]
 
 
 # -------------------------------------------------
-# EVENT CARD (LIST TAB)
+# "NEAR ME" (PROXIMITY SEARCH)
 # -------------------------------------------------
-def render_event_card(event: pd.Series) -> None:
-    img_url = event.get("image_url")
-    valid_image = img_url and isinstance(img_url, str) and img_url.startswith("http")
+def apply_proximity(df: pd.DataFrame, view):
+    """Keep events within a radius of a geocoded place, nearest first.
 
-    if not valid_image:
-        img_html = """
-        <div style="width:100%; height:180px; background:#333;
-                    border-radius:10px; display:flex; justify-content:center;
-                    align-items:center; color:#bbb; font-size:0.9rem;">
-            No image
-        </div>
-        """
-    else:
-        img_html = f"""
-        <img src="{img_url}" style="width:100%; height:180px; object-fit:cover;
-             border-radius:10px;" onerror="this.style.display='none';" />
-        """
-
-    start_fmt = format_dt_eu(event.get("start_time"))
-    end_fmt = format_dt_eu(event.get("end_time"))
-
-    html = f"""
-    <div style="border-radius:12px; border:1px solid #333; padding:16px;
-                margin-bottom:18px; background-color:#1e1e1e; color:#f2f2f2;">
-
-        {img_html}
-
-        <div style="margin-top:10px; display:flex; justify-content:space-between;
-                    align-items:center;">
-
-            <div style="font-weight:700; font-size:1.15rem;">
-                {event.get('product_name','')}
-                <span style="font-weight:400; color:#bbbbbb;">
-                    {(" – " + event.get('brand_id','')) if event.get('brand_id') else ""}
-                </span>
-            </div>
-
-            <div style="font-size:0.75rem; padding:3px 10px; border-radius:999px;
-                        background-color:#00c85333; color:#00c853;
-                        border:1px solid #00c85355; font-weight:600;">
-                {T["approved"]}
-            </div>
-        </div>
-
-        <div style="color:#ccc; margin-top:6px;">
-            {event.get('store_name','')} • {event.get('address','')}, {event.get('city','')}
-        </div>
-
-        <div style="color:#aaa; margin-top:6px;">
-            {start_fmt} – {end_fmt}
-        </div>
-
-        <div style="margin-top:10px; color:#e0e0e0;">
-            {event.get('description','')}
-        </div>
-
-    </div>
+    `view` is the (version, frame) pair the grid index is built from; `df`
+    the already filtered subset of that frame. Returns (df, point, radius_km), with point
+    None when no place is entered. Adds a distance_km column.
     """
-    st.html(html)
+    with st.expander(T["near_title"], expanded=bool(st.session_state.get("near_query"))):
+        c1, c2 = st.columns([2, 1])
+        query = c1.text_input(T["near_query"], key="near_query")
+        radius_km = c2.slider(T["near_radius"], 1, 100, 10, key="near_radius")
+
+    if df is None or df.empty or not query.strip():
+        return df, None, radius_km
+
+    try:
+        point = get_geocoder().geocode(query.strip(), "")
+    except Exception:
+        point = None
+    if not point:
+        st.warning(T["near_not_found"])
+        return df, None, radius_km
+
+    # Bounding box via the grid index, then vectorized haversine on candidates
+    grid = public_snapshot.derived("grid", GridIndex.from_frame, view)
+    positions, dist_km = grid.query_radius(*point, radius_km)
+    near = view[1].iloc[positions].assign(distance_km=dist_km)
+    return near[near.index.isin(df.index)], point, radius_km
+
+
+# Only the list and map tabs need the public events; the form and admin
+# tabs skip loading, normalizing and filtering them entirely.
+PUBLIC_TABS = ("list", "map")
+
+# In static mode the map's markers come straight from the CDN files
+# (static_export.py), so the map tab skips the pipeline too. None when not
+# configured or the manifest can't be fetched (the map falls back to it).
+static_manifest = None
+if st.session_state["active_tab"] == "map" and MAP_STATIC_BASE_URL:
+    static_manifest = load_static_manifest(MAP_STATIC_BASE_URL)
+
+if st.session_state["active_tab"] in PUBLIC_TABS and not static_manifest:
+    # -------------------------------------------------
+    # FETCH EVENTS (SHARED SNAPSHOT, INCLUDES FIRESTORE DOC IDS)
+    # -------------------------------------------------
+    # Approval and the "not yet ended" window are applied by the query
+    # itself (see fetch_public_events / EventReplica.public_events), so only
+    # public events arrive here. The frame is already normalized
+    # (normalize.py) once per data version. The whole rerun works on this
+    # one (version, frame) pair.
+    public_view = public_snapshot.view()
+    snapshot_version, events_clean = public_view
+
+    # -------------------------------------------------
+    # APPLY FILTERS
+    # -------------------------------------------------
+    with perf.span("filters") as sizes:
+        filtered_df = apply_filters(public_view)
+        sizes["rows"] = 0 if filtered_df is None else len(filtered_df)
+
+    with perf.span("proximity"):
+        filtered_df, near_point, near_radius_km = apply_proximity(filtered_df, public_view)
 
 
 # -------------------------------------------------
-# LIST TAB
+# LIST TAB (paged, one HTML block per page)
 # -------------------------------------------------
 if st.session_state["active_tab"] == "list":
     if filtered_df.empty:
         st.info(T["no_events"])
     else:
-        for _, row in filtered_df.iterrows():
-            render_event_card(row)
+        # Nearest first in "near me" mode, otherwise by time
+        if near_point is not None:
+            sort_by = st.radio(
+                T["sort_by"],
+                ["distance", "time"],
+                format_func=lambda k: T[f"sort_{k}"],
+                horizontal=True,
+                key="list_sort",
+            )
+            if sort_by == "time":
+                filtered_df = filtered_df.sort_values("start_dt", kind="stable")
+
+        total = len(filtered_df)
+        pages = max(1, -(-total // LIST_PAGE_SIZE))
+
+        # Filters may have shrunk the result set since the last rerun
+        page = min(st.session_state.get("list_page", 0), pages - 1)
+        st.session_state["list_page"] = page
+
+        start = page * LIST_PAGE_SIZE
+        page_df = filtered_df.iloc[start:start + LIST_PAGE_SIZE]
+        with perf.span("list_html", rows=len(page_df)) as sizes:
+            html = cards_html(page_df.to_dict("records"), st.session_state["lang"], T["approved"])
+            sizes["html_bytes"] = len(html.encode())
+        st.html(html)
+
+        if pages > 1:
+            p1, p2, p3 = st.columns([1, 1, 2])
+            if p1.button(T["prev_page"], disabled=page == 0):
+                st.session_state["list_page"] = page - 1
+                st.rerun()
+            if p2.button(T["next_page"], disabled=page >= pages - 1):
+                st.session_state["list_page"] = page + 1
+                st.rerun()
+            p3.caption(T["page_of"].format(page=page + 1, pages=pages, total=total))
+
+
 # -------------------------------------------------
 # MAP TAB (Folium – Safe Upgrade, Same Design)
 # -------------------------------------------------
-if st.session_state["active_tab"] == "map":
+if st.session_state["active_tab"] == "map" and static_manifest:
+    import folium
+    from streamlit_folium import st_folium
+
+    from map_layers import add_locate_control, add_static_layer
+    from static_export import select_files
+
+    # Only the date range can be applied to the day/region files; the other
+    # filters would need the server-side pipeline this mode avoids
+    today = local_now().date()
+    st.markdown(f"### {T['filters_title']}")
+    c1, c2 = st.columns(2)
+    date_from = c1.date_input(T["filter_from"], value=today, min_value=today, key="static_from")
+    date_to = c2.date_input(
+        T["filter_to"], value=today + timedelta(days=MAP_STATIC_DAYS - 1), min_value=today, key="static_to"
+    )
+    st.caption(T["static_filters_note"])
+
+    wanted = list(pd.date_range(date_from, date_to).strftime("%Y-%m-%d"))
+    days, cut = wanted[:MAP_STATIC_DAYS], wanted[MAP_STATIC_DAYS:]
+    if select_files(static_manifest, cut):
+        st.warning(T["static_days_capped"].format(
+            n=MAP_STATIC_DAYS, date=pd.Timestamp(days[-1]).strftime("%d-%m-%Y")
+        ))
+    if not select_files(static_manifest, days):
+        st.info(T["no_events_map"])
+        st.stop()
+
+    prev_state = st.session_state.get(MAP_KEY) or {}
+    box = viewport_box(prev_state.get("bounds"), MAP_VIEWPORT_MARGIN)
+
+    # Cheap to build: the page only carries the file URLs
+    with perf.span("map_build") as sizes:
+        files = select_files(static_manifest, days, box)
+        if box:
+            south, west, north, east = box
+            center = prev_state.get("center") or {}
+            m = folium.Map(
+                location=[center.get("lat", (south + north) / 2), center.get("lng", (west + east) / 2)],
+                zoom_start=prev_state.get("zoom") or 11,
+                tiles="CartoDB dark_matter",
+                control_scale=True,
+            )
+        else:
+            # First load: fit to the region tiles that have events
+            m = folium.Map(tiles="CartoDB dark_matter", control_scale=True)
+            m.fit_bounds(
+                [
+                    [min(f["bbox"][0] for f in files), min(f["bbox"][1] for f in files)],
+                    [max(f["bbox"][2] for f in files), max(f["bbox"][3] for f in files)],
+                ]
+            )
+
+        add_static_layer(m, [f"{MAP_STATIC_BASE_URL}/{f['path']}" for f in files])
+        add_locate_control(m)
+        sizes["files"] = len(files)
+
+    with perf.span("st_folium", markers=sum(f["count"] for f in files)):
+        st_folium(m, width="100%", height=520, key=MAP_KEY)
+
+
+if st.session_state["active_tab"] == "map" and not static_manifest:
+    import folium
+    from streamlit_folium import st_folium
+
+    from map_layers import (
+        add_cluster_layer,
+        add_lazy_cluster_layer,
+        add_locate_control,
+        add_marker_layer,
+        add_user_location,
+        clicked_event_id,
+        fit_to_events,
+        id_rows,
+        popup_rows,
+        rows_bounds,
+    )
 
     if filtered_df.empty:
         st.info(T["no_events_map"])
         st.stop()
 
-    # Recompute formats for map display
-    def format_dt_for_map(v):
-        try:
-            dt = to_datetime(v)
-            return dt.strftime("%d-%m-%Y %H:%M") if dt else ""
-        except Exception:
-            return ""
-
-    mdf = filtered_df.copy()
-    mdf["start_fmt"] = mdf["start_time"].apply(format_dt_for_map)
-    mdf["end_fmt"] = mdf["end_time"].apply(format_dt_for_map)
-
-    # Safe float conversion for coordinates
-    def safe_float(x):
-        try:
-            return float(x)
-        except:
-            return None
-
-    mdf["lat_clean"] = mdf["latitude"].apply(safe_float)
-    mdf["lon_clean"] = mdf["longitude"].apply(safe_float)
-    mdf = mdf.dropna(subset=["lat_clean", "lon_clean"])
+    # start_fmt/end_fmt and lat_clean/lon_clean come from normalize_events
+    mdf = filtered_df.dropna(subset=["lat_clean", "lon_clean"])
 
     if mdf.empty:
         st.info("No valid coordinates to show.")
         st.stop()
 
-    # Auto-center based on valid coordinates
-    avg_lat = mdf["lat_clean"].mean()
-    avg_lon = mdf["lon_clean"].mean()
-
-    m = folium.Map(
-        location=[avg_lat, avg_lon],
-        zoom_start=11,
-        tiles="CartoDB dark_matter",
-        control_scale=True,
+    map_cache = get_map_cache()
+
+    # A new "near me" point gets a fresh map widget, centred on that point
+    map_key = MAP_KEY
+    if near_point is not None:
+        map_key = f"{MAP_KEY}_near_{near_point[0]:.5f}_{near_point[1]:.5f}_{near_radius_km}"
+
+    # Last viewport reported by st_folium (None on first load)
+    prev_state = st.session_state.get(map_key) or {}
+    box = viewport_box(prev_state.get("bounds"), MAP_VIEWPORT_MARGIN)
+
+    lazy = MAP_RENDER_MODE != "markers" and MAP_LAZY_POPUPS
+
+    def marker_rows():
+        """(frame index labels, rows) for every filtered event with coordinates."""
+        rows = id_rows(mdf) if lazy else popup_rows(mdf, st.session_state["lang"])
+        return mdf.index.to_numpy(), rows
+
+    # Everything the marker rows depend on: sessions with the same data
+    # version, filters and language share them, whatever part of the map
+    # they look at (the viewport is applied after the lookup).
+    time_filtered = st.session_state.get("f_when", "any") != "any"
+    rows_key = (
+        snapshot_version,
+        st.session_state["lang"],
+        tuple(st.session_state.get(k) for k in FILTER_KEYS + ("search_query",)),
+        local_now().strftime("%Y-%m-%d %H:%M") if time_filtered else local_now().date(),
+        near_point,
+        near_radius_km,
+        lazy,
     )
 
-    bounds = []
-
-    # Add violet markers + your popup card
-    for _, row in mdf.iterrows():
-
-        img_url = row.get("image_url", "")
-        if img_url and isinstance(img_url, str) and img_url.startswith("http"):
-            thumb_html = f"""
-                <img src="{img_url}"
-                     style="width:100%; height:150px; object-fit:cover;
-                            border-radius:10px; margin-bottom:10px;" />
-            """
+    # A fresh folium.Map every rerun: st_folium alters the map while
+    # rendering it, so a shared map object would come out broken the
+    # second time. Only the rows are reused.
+    with perf.span("map_build") as sizes:
+        (labels, rows), hit = map_cache.get_or_build(rows_key, marker_rows)
+        if box:
+            # Only events inside the visible area (+ margin), via the grid index
+            grid = public_snapshot.derived("grid", GridIndex.from_frame, public_view)
+            visible = np.isin(labels, events_clean.index[grid.query(*box)])
+            rows = [rows[i] for i in np.flatnonzero(visible)]
+        sizes["markers"] = len(rows)
+        sizes["cache_hit"] = int(hit)
+
+        if box:
+            south, west, north, east = box
+            center = prev_state.get("center") or {}
+            m = folium.Map(
+                location=[
+                    center.get("lat", (south + north) / 2),
+                    center.get("lng", (west + east) / 2),
+                ],
+                zoom_start=prev_state.get("zoom") or 11,
+                tiles="CartoDB dark_matter",
+                control_scale=True,
+            )
         else:
-            thumb_html = """
-                <div style="width:100%; height:150px; background:#333;
-                            border-radius:10px; margin-bottom:10px;
-                            display:flex; justify-content:center; align-items:center;
-                            color:#bbb; font-size:0.9rem;">
-                    No image
-                </div>
-            """
-
-        popup_html = f"""
-        <div style="
-            font-size:14px;
-            line-height:1.6;
-            background:#1e1e1e;
-            color:#f2f2f2;
-            padding:16px;
-            border-radius:12px;
-            width:240px;
-            overflow:hidden;
-        ">
-            {thumb_html}
-
-            <div style="font-size:16px; font-weight:700; color:#ffffff;">
-                {row.get('product_name', '')}
-            </div>
-
-            <div style="color:#bbbbbb; margin-bottom:8px;">
-                {row.get('brand_id', '')}
-            </div>
-
-            <div style="margin-bottom:6px; color:#e0e0e0;">
-                <b>{row.get('store_name','')}</b><br>
-                {row.get('address','')}, {row.get('city','')}
-            </div>
-
-            <div style="color:#cccccc; margin-bottom:8px;">
-                <b>{row.get('start_fmt','')}</b> – <b>{row.get('end_fmt','')}</b>
-            </div>
-
-            <div style="color:#dddddd;">
-                {row.get('description','')}
-            </div>
-        </div>
-        """
-
-        popup = folium.Popup(
-            folium.IFrame(popup_html, width=260, height=350),
-            max_width=260,
-        )
-
-        # Violet marker with slightly larger radius for mobile usability
-        folium.CircleMarker(
-            location=[row["lat_clean"], row["lon_clean"]],
-            radius=10,
-            color="#9C27B0",
-            fill=True,
-            fill_color="#9C27B0",
-            fill_opacity=0.85,
-            popup=popup,
-        ).add_to(m)
+            # Auto-center based on valid coordinates
+            m = folium.Map(
+                location=[mdf["lat_clean"].mean(), mdf["lon_clean"].mean()],
+                zoom_start=11,
+                tiles="CartoDB dark_matter",
+                control_scale=True,
+            )
 
-        bounds.append([row["lat_clean"], row["lon_clean"]])
+        if MAP_RENDER_MODE == "markers":
+            add_marker_layer(m, rows)
+        elif lazy:
+            add_lazy_cluster_layer(m, rows)
+        else:
+            add_cluster_layer(m, rows)
 
-    # Auto-fit map to all markers safely
-    if bounds:
-        m.fit_bounds(bounds, padding=(20, 20))
+        add_locate_control(m)
 
-    st_folium(m, width="100%", height=520)
+        if near_point is not None:
+            # Centre on the "near me" point on first load, then keep the user's view
+            add_user_location(m, near_point, near_radius_km, fit=not box)
+        elif not box and rows:
+            # First load: auto-fit map to all markers safely
+            fit_to_events(m, rows_bounds(rows))
 
+    # Panning/zooming reruns the script with the new bounds in session_state
+    with perf.span("st_folium", markers=len(rows)):
+        map_state = st_folium(m, width="100%", height=520, key=map_key)
 
-# -------------------------------------------------
-# GEOCODING (Address + City)
-# -------------------------------------------------
-def geocode_address(address, city):
-    """Return (lat, lon) from Nominatim or None."""
-    try:
-        query = f"{address}, {city}, Finland"
-        url = "https://nominatim.openstreetmap.org/search"
-
-        params = {
-            "q": query,
-            "format": "json",
-            "limit": 1,
-            "addressdetails": 1,
-            "countrycodes": "fi",
-        }
-
-        response = requests.get(
-            url,
-            params=params,
-            headers={"User-Agent": "MaistiaisetMap/1.0"},
-            timeout=10,
-        )
-        data = response.json()
-        if not data:
-            return None
+    # Lazy popup: build the clicked event's card from the data we already hold
+    if lazy:
+        event_id = clicked_event_id(map_state)
+        if event_id:
+            match = filtered_df[filtered_df["id"] == event_id]
+            if not match.empty:
+                st.html(cached_popup_html(match.iloc[0], st.session_state["lang"]))
 
-        return float(data[0]["lat"]), float(data[0]["lon"])
 
-    except Exception:
-        return None
 # -------------------------------------------------
 # FORM TAB (Event Submission) — PERSISTENT FIELDS
 # -------------------------------------------------
 if st.session_state["active_tab"] == "form":
+    from submission_worker import FAILED, QUEUED, RUNNING
     st.subheader(T["form_tab"])
     st.markdown("<div style='margin-bottom:6px;'></div>", unsafe_allow_html=True)
 
-    bucket = storage.bucket()
-
     # Initialize session_state defaults
     defaults = {
         "product_name": "",
@@ -722,8 +1110,8 @@ if st.session_state["active_tab"] == "form":
         "city": "",
         "description": "",
         "image_file": None,
-        "start_date": datetime.today().date(),
-        "end_date": datetime.today().date(),
+        "start_date": local_now().date(),
+        "end_date": local_now().date(),
         "start_time_val": time(12, 0),
         "end_time_val": time(13, 0),
         "manual_times": False,
@@ -802,70 +1190,71 @@ if st.session_state["active_tab"] == "form":
             start_str = start_time_val if manual_times else start_time_val.strftime("%H:%M")
             end_str   = end_time_val if manual_times else end_time_val.strftime("%H:%M")
 
-            start_dt = pd.to_datetime(f"{start_date} {start_str}", errors="coerce")
-            end_dt   = pd.to_datetime(f"{end_date} {end_str}", errors="coerce")
-
-            # VALIDATION
-            if start_dt is None or end_dt is None or pd.isna(start_dt) or pd.isna(end_dt):
-                st.error("Invalid date or time format.")
-                st.stop()
-
-            if end_dt < start_dt:
-                st.error("End time cannot be earlier than the start time.")
+            # VALIDATION (inline, same rules as bulk_import.py)
+            try:
+                start_dt, end_dt = parse_event_times(start_date, start_str, end_date, end_str)
+            except SubmissionError as e:
+                st.error(str(e))
                 st.stop()
 
             # ----------------------------------------
-            # GEOCODING
-            # ----------------------------------------
-            coords = geocode_address(address, city)
-            if not coords:
-                st.error("Could not find this address. Please check spelling or add city name.")
-                st.stop()
-
-            lat, lon = coords
-
-            # ----------------------------------------
-            # BASE DOCUMENT
+            # QUEUE: geocode → Firestore write → image upload run on the
+            # background worker; the status below updates when it's done
             # ----------------------------------------
-            base_doc = {
-                "product_name": product_name,
-                "brand_id": brand_id,
-                "store_name": store_name,
-                "address": address,
-                "city": city,
-                "latitude": lat,
-                "longitude": lon,
-                "description": description,
-                "start_time": start_dt.strftime("%Y-%m-%d %H:%M"),
-                "end_time": end_dt.strftime("%Y-%m-%d %H:%M"),
-                "approved": False,
-            }
-
-            # CREATE FS DOCUMENT
-            doc_ref = db.collection("events").document()
-            doc_ref.set(base_doc)
-            doc_id = doc_ref.id
-
-            # ----------------------------------------
-            # IMAGE UPLOAD — FIXED (NO make_public)
-            # ----------------------------------------
-            if image_file:
-                try:
-                    blob = bucket.blob(f"events/{doc_id}/image.jpg")
-                    blob.upload_from_file(image_file, content_type=image_file.type)
-
-                    # Uniform bucket-level access → no ACL allowed
-                    image_url = blob.public_url
-
-                    doc_ref.update({"image_url": image_url})
-
-                except Exception as e:
-                    st.warning(f"Image upload failed: {e}")
+            job_id = get_submission_worker().submit(
+                {
+                    "product_name": product_name,
+                    "brand_id": brand_id,
+                    "store_name": store_name,
+                    "address": address,
+                    "city": city,
+                    "description": description,
+                },
+                start_dt,
+                end_dt,
+                image_file.getvalue() if image_file else None,
+            )
+            # Keep earlier jobs only while they are still running
+            worker = get_submission_worker()
+            earlier = st.session_state.get("submission_jobs", [])
+            st.session_state["submission_jobs"] = [
+                j for j, job in zip(earlier, map(worker.status, earlier))
+                if job and job.status in (QUEUED, RUNNING)
+            ] + [job_id]
+
+    # ----------------------------------------
+    # SUBMISSION STATUS (polls the worker while jobs are running)
+    # ----------------------------------------
+    job_ids = st.session_state.get("submission_jobs", [])
+    worker = get_submission_worker()
+    statuses = [worker.status(j) for j in job_ids]
+    running = any(job and job.status in (QUEUED, RUNNING) for job in statuses)
+
+    @st.fragment(run_every=1 if running else None)
+    def submission_status():
+        still_running = False
+        for j in job_ids:
+            job = worker.status(j)
+            if job is None:
+                continue
+            if job.status in (QUEUED, RUNNING):
+                still_running = True
+                st.info(T["submission_pending"])
+            elif job.status == FAILED:
+                st.error(job.message)
+            else:
+                if job.message:
+                    st.warning(job.message)
+                st.success("Event submitted for approval!")
+
+        # Everything settled — one full rerun turns the polling off
+        if running and not still_running:
+            st.rerun()
 
-            st.success("Event submitted for approval!")
+    submission_status()
 
 # -------------------------------------------------
-# ADMIN TAB (Login, Logout, Approve, Delete)
+# ADMIN TAB (Login, Logout, Bulk Approve/Delete)
 # -------------------------------------------------
 if st.session_state["active_tab"] == "admin":
     st.subheader(T["login_title"])
@@ -894,47 +1283,183 @@ if st.session_state["active_tab"] == "admin":
 
         st.header(T["admin_panel"])
 
-        all_events = events_df if not events_df.empty else pd.DataFrame()
-
-        if all_events.empty:
-            st.info("No events available.")
-        else:
-            for index, row in all_events.iterrows():
-                st.write("---")
-
-                st.write(f"**{row.get('product_name','')} – {row.get('brand_id','')}**")
-                st.write(
-                    row.get("store_name", ""),
-                    "•",
-                    row.get("address", ""),
-                    "•",
-                    row.get("city", ""),
-                )
-                st.write(f"{row.get('start_time','')} – {row.get('end_time','')}")
-                st.write(row.get("description", ""))
-
-                colA, colB = st.columns([1, 1])
-
-                # APPROVE BUTTON
-                with colA:
-                    if not row.get("approved", False):
-                        if st.button(T["approve_button"], key=f"approve_{index}"):
+        # One-shot message left by the last bulk action (shown after its rerun)
+        flash = st.session_state.pop("admin_flash", None)
+        if flash:
+            st.success(flash)
+
+        # PENDING-FIRST QUEUE (one filtered, paged query per rerun)
+        queue = st.radio(
+            T["admin_queue"],
+            ["pending", "approved"],
+            format_func=lambda q: T[q],
+            horizontal=True,
+            key="admin_queue",
+        )
 
-                            # Approve THIS exact document using its Firestore ID
-                            db.collection("events").document(row["id"]).update(
-                                {"approved": True}
-                            )
+        # Stack of "start after" doc ids for the pages visited so far
+        cursors = st.session_state.setdefault(f"admin_cursors_{queue}", [None])
 
-                            st.success(T["approved_msg"])
-                            st.rerun()
-                    else:
-                        st.success(T["approved"])
+        # Pages already fetched this session; all that is shown past the read budget
+        page_cache = st.session_state.setdefault("admin_page_cache", {})
+        page_key = (queue, cursors[-1])
+        if over_read_budget:
+            st.warning(T["budget_exceeded"])
+            docs, has_more = page_cache.get(page_key, ([], False))
+        else:
+            docs, has_more = fetch_events_page(
+                db, approved=(queue == "approved"), page_size=ADMIN_PAGE_SIZE, after_id=cursors[-1]
+            )
+            page_cache[page_key] = (docs, has_more)
 
-                # DELETE BUTTON
-                with colB:
-                    if st.button("Delete", key=f"delete_{index}"):
+        if not docs:
+            st.info("No events available.")
+        else:
+            page = normalize_events(pd.DataFrame(docs))
+            table = pd.DataFrame(
+                {
+                    "select": False,
+                    T["product_name"]: page.get("product_name"),
+                    T["brand_id"]: page.get("brand_id"),
+                    T["store_name"]: page.get("store_name"),
+                    T["city"]: page.get("city"),
+                    T["start_time"]: page["start_fmt"],
+                    T["end_time"]: page["end_fmt"],
+                    "Description": page.get("description"),
+                }
+            )
+            table.index = page["id"]
+
+            # Bumped after every bulk action so stale checkbox state never
+            # carries over onto the rows that replace the processed ones
+            nonce = st.session_state.setdefault("admin_nonce", 0)
+            table_key = f"{queue}_{len(cursors)}_{nonce}"
+
+            if st.checkbox(T["select_all"], key=f"select_all_{table_key}"):
+                table["select"] = True
+
+            edited = st.data_editor(
+                table,
+                key=f"admin_table_{table_key}",
+                hide_index=True,
+                disabled=[c for c in table.columns if c != "select"],
+                column_config={"select": st.column_config.CheckboxColumn(T["select"])},
+            )
+            selected = edited.index[edited["select"]].tolist()
+
+            colA, colB = st.columns([1, 1])
+
+            # BULK APPROVE (batched writes)
+            with colA:
+                if queue == "pending" and st.button(
+                    T["approve_selected"].format(n=len(selected)), disabled=not selected
+                ):
+                    n = set_approved(db, selected)
+                    # Newly public — mirror the change, then let the public query pick them up
+                    replica = get_replica()
+                    if replica is not None:
+                        for doc_id in selected:
+                            replica.update(doc_id, {"approved": True})
+                    public_snapshot.invalidate()
+                    if STATIC_PUBLISH:
+                        get_static_publisher().request(public_snapshot.frame)
+                    st.session_state["admin_nonce"] = nonce + 1
+                    st.session_state["admin_page_cache"] = {}
+                    st.session_state["admin_flash"] = f"{T['approved_msg']} ({n})"
+                    st.rerun()
+
+            # BULK DELETE (batched writes)
+            with colB:
+                if st.button(T["delete_selected"].format(n=len(selected)), disabled=not selected):
+                    n = delete_events(db, selected)
+                    if get_replica() is not None:
+                        get_replica().remove_many(selected)
+                    for doc_id in selected:
+                        public_snapshot.remove(doc_id)
+                    if STATIC_PUBLISH:
+                        get_static_publisher().request(public_snapshot.frame)
+                    st.session_state["admin_nonce"] = nonce + 1
+                    st.session_state["admin_page_cache"] = {}
+                    st.session_state["admin_flash"] = f"{T['deleted_msg']} ({n})"
+                    st.rerun()
+
+        # PAGINATION
+        p1, p2 = st.columns([1, 1])
+        if p1.button(T["prev_page"], key="admin_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        if p2.button(T["next_page"], key="admin_next", disabled=not has_more):
+            cursors.append(docs[-1]["id"])
+            st.rerun()
 
-                        db.collection("events").document(row["id"]).delete()
+        # ARCHIVE (expired events moved out of the hot collection)
+        if archiver is not None:
+            with st.expander(T["archive_title"]):
+                if archiver.last_run:
+                    st.caption(
+                        T["archive_status"].format(
+                            n=archiver.last_moved, when=archiver.last_run.strftime(DISPLAY_FORMAT)
+                        )
+                    )
+                if archiver.last_error:
+                    st.error(archiver.last_error)
+                if st.button(T["archive_now"]):
+                    archiver.run_now()
+                    st.rerun()
+
+        # PERFORMANCE (rolling per-stage timings, all sessions since start/reset)
+        with st.expander(T["perf_title"]):
+            summary = perf.summary()
+            gauges = {
+                "snapshot_version": public_snapshot.version,
+                "html_cache_entries": len(html_cache),
+                "html_cache_hits": html_cache.hits,
+                "html_cache_misses": html_cache.misses,
+            }
 
-                        st.warning("Event deleted.")
-                        st.rerun()
+            if not summary:
+                st.caption(T["perf_empty"])
+            else:
+                st.dataframe(
+                    pd.DataFrame(
+                        [
+                            {"stage": stage, **{k: v for k, v in s.items() if k != "sizes"}, **s["sizes"]}
+                            for stage, s in summary.items()
+                        ]
+                    ),
+                    hide_index=True,
+                )
+            st.caption(" · ".join(f"{k}: {v}" for k, v in gauges.items()))
+
+            d1, d2, d3 = st.columns(3)
+            d1.download_button("JSON", perf.to_json({"gauges": gauges}), "perf.json", "application/json")
+            d2.download_button("Prometheus", perf.to_prometheus(gauges), "metrics.txt", "text/plain")
+            if d3.button(T["perf_reset"]):
+                perf.reset()
+                st.rerun()
+
+        # FIRESTORE USAGE (billed reads/writes, all sessions since start)
+        with st.expander(T["usage_title"]):
+            usage = meter.summary()
+            session = meter.session(st.session_state["session_id"])
+            m1, m2, m3 = st.columns(3)
+            m1.metric(T["usage_total"], f"{usage['total']['reads']} / {usage['total']['writes']}")
+            m2.metric(T["usage_5min"], f"{usage['last_5_min']['reads']} / {usage['last_5_min']['writes']}")
+            m3.metric(T["usage_session"], f"{session.reads} / {session.writes}")
+            if SESSION_READ_BUDGET:
+                st.caption(T["usage_budget"].format(n=SESSION_READ_BUDGET))
+            if usage["top_sessions"]:
+                st.dataframe(pd.DataFrame(usage["top_sessions"]), hide_index=True)
+
+            u1, u2 = st.columns(2)
+            u1.download_button("JSON", meter.to_json(), "firestore_usage.json", "application/json")
+            u2.download_button("Prometheus", meter.to_prometheus(), "firestore_metrics.txt", "text/plain")
+
+
+# Whole-script time per tab (reruns cut short by st.stop() are not counted)
+perf.record(
+    f"rerun_{st.session_state['active_tab']}",
+    perf_counter() - rerun_started,
+    firestore_reads=rerun_usage.reads,
+    firestore_writes=rerun_usage.writes,
+)
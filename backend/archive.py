@@ -0,0 +1,221 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from event_store import EVENTS_COLLECTION, MAX_BATCH_WRITES, commit_in_batches
+from normalize import local_now
+
+# -------------------------------------------------
+# ARCHIVAL OF EXPIRED EVENTS (keeps the hot collection small)
+# -------------------------------------------------
+# Events whose end_time is older than the retention window are copied to
+# an archive (Firestore collection or a local gzipped JSONL file) and then
+# deleted from `events`, in batched writes.
+#
+# Usage:
+#   python archive.py run [--retention-days 30] [--file archive.jsonl.gz] [--dry-run]
+#   python archive.py stats [--file archive.jsonl.gz]
+#
+# Legacy string times are not matched by the end_time range query; run
+# migrate_times.py first if any are left.
+ARCHIVE_COLLECTION = "events_archive"
+DEFAULT_RETENTION_DAYS = 30
+
+# Docs moved per round: one set + one delete each, so a round fills one batch
+ARCHIVE_CHUNK = MAX_BATCH_WRITES // 2
+
+
+def archive_cutoff(retention_days=DEFAULT_RETENTION_DAYS, now=None):
+    """Events ending before this (midnight, retention_days ago) get archived."""
+    now = now or local_now()
+    midnight = datetime.combine(now.date(), datetime.min.time())
+    return midnight - timedelta(days=retention_days)
+
+
+def _expired_query(db, cutoff, collection):
+    # Imported here so app.py can start the scheduler without loading google-cloud
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    return (
+        db.collection(collection)
+        .where(filter=FieldFilter("end_time", "<", cutoff))
+        .order_by("end_time")
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Field types the app never writes (GeoPoint, bytes, refs, ...) are kept
+    # as text: raising here would stop every later archive run at this doc
+    return str(value)
+
+
+def archive_expired(db, cutoff, archive_path=None, collection=EVENTS_COLLECTION,
+                    archive_collection=ARCHIVE_COLLECTION, dry_run=False, chunk=ARCHIVE_CHUNK):
+    """Move events ending before `cutoff` to the archive. Returns the number moved.
+
+    Each round archives a chunk first and deletes it only after that
+    succeeded, so a failure can leave a doc in both places but never in
+    neither. Re-running is safe: archive entries are keyed by doc id.
+    """
+    query = _expired_query(db, cutoff, collection)
+    if dry_run:
+        return sum(1 for _ in query.stream())
+
+    archived_at = datetime.now()
+    moved = 0
+
+    # Always take the first chunk: the previous one is gone by then
+    while True:
+        snaps = list(query.limit(chunk).stream())
+        if not snaps:
+            return moved
+
+        if archive_path:
+            os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+            with gzip.open(archive_path, "at", encoding="utf-8") as f:
+                for s in snaps:
+                    row = {**s.to_dict(), "id": s.id, "archived_at": archived_at}
+                    f.write(json.dumps(row, default=_json_default, ensure_ascii=False) + "\n")
+            writes = (("delete", s.reference, None) for s in snaps)
+        else:
+            archive = db.collection(archive_collection)
+            writes = (
+                w
+                for s in snaps
+                for w in (
+                    ("set", archive.document(s.id), {**s.to_dict(), "archived_at": archived_at}),
+                    ("delete", s.reference, None),
+                )
+            )
+
+        commit_in_batches(db, writes)
+        moved += len(snaps)
+
+
+class ArchiveScheduler:
+    """Runs archive_expired() on a daemon thread every `interval` seconds (used by app.py)."""
+
+    def __init__(self, db, retention_days=DEFAULT_RETENTION_DAYS, interval=24 * 3600, archive_path=None):
+        self.db = db
+        self.retention_days = retention_days
+        self.interval = interval
+        self.archive_path = archive_path
+
+        self.last_run = None
+        self.last_moved = 0
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        threading.Thread(target=self._loop, daemon=True, name="archiver").start()
+
+    def run_now(self):
+        """Archive immediately on the calling thread; returns the number moved."""
+        with self._lock:
+            try:
+                self.last_moved = archive_expired(
+                    self.db, archive_cutoff(self.retention_days), archive_path=self.archive_path
+                )
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self.last_run = datetime.now()
+            return self.last_moved
+
+    def _loop(self):
+        while True:
+            self.run_now()
+            self._wake.wait(self.interval)
+
+
+# -------------------------------------------------
+# READING THE ARCHIVE (history / statistics)
+# -------------------------------------------------
+def read_archive_file(path):
+    """Yield archived event dicts from a gzipped JSONL archive."""
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_archive_collection(db, since=None, archive_collection=ARCHIVE_COLLECTION):
+    """Yield archived event dicts from Firestore, optionally ending on/after `since`."""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    query = db.collection(archive_collection)
+    if since is not None:
+        query = query.where(filter=FieldFilter("end_time", ">=", since))
+    for s in query.stream():
+        yield {**s.to_dict(), "id": s.id}
+
+
+def archive_stats(events):
+    """Counts of archived events per month, brand and city."""
+    per_month, per_brand, per_city = Counter(), Counter(), Counter()
+    total = 0
+    for e in events:
+        total += 1
+        end = e.get("end_time")
+        month = end.strftime("%Y-%m") if isinstance(end, datetime) else str(end or "")[:7]
+        per_month[month or "?"] += 1
+        per_brand[e.get("brand_id") or "?"] += 1
+        per_city[e.get("city") or "?"] += 1
+    return {"total": total, "per_month": per_month, "per_brand": per_brand, "per_city": per_city}
+
+
+def print_stats(stats, top=10):
+    print(f"Archived events: {stats['total']}")
+    print("\nPer month:")
+    for month, n in sorted(stats["per_month"].items()):
+        print(f"  {month}  {n}")
+    for title, key in (("Top brands", "per_brand"), ("Top cities", "per_city")):
+        print(f"\n{title}:")
+        for name, n in stats[key].most_common(top):
+            print(f"  {name:<24} {n}")
+
+
+def main(argv=None):
+    from firebase_client import init_db, load_secrets
+
+    parser = argparse.ArgumentParser(description="Archive expired events / show archive statistics.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="move expired events to the archive")
+    run.add_argument("--retention-days", type=int, help=f"default: [archive] retention_days or {DEFAULT_RETENTION_DAYS}")
+    run.add_argument("--file", help="archive to this .jsonl.gz file instead of a Firestore collection")
+    run.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+
+    stats = sub.add_parser("stats", help="summarize archived events")
+    stats.add_argument("--file", help="read this .jsonl.gz file instead of the archive collection")
+
+    args = parser.parse_args(argv)
+    secrets = load_secrets()
+    db = init_db(secrets)
+
+    if args.command == "stats":
+        events = read_archive_file(args.file) if args.file else read_archive_collection(db)
+        print_stats(archive_stats(events))
+        return 0
+
+    retention = args.retention_days
+    if retention is None:
+        retention = secrets.get("archive", {}).get("retention_days", DEFAULT_RETENTION_DAYS)
+    cutoff = archive_cutoff(retention)
+    moved = archive_expired(db, cutoff, archive_path=args.file, dry_run=args.dry_run)
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {moved} event(s) that ended before {cutoff:%Y-%m-%d}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
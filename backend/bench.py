@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+import folium
+import numpy as np
+import pandas as pd
+
+from event_html import cards_html, html_cache
+from event_store import EVENTS_COLLECTION, fetch_public_events, public_window_start
+from facets import FacetIndex
+from fake_firestore import FakeFirestore
+from interval_index import IntervalIndex
+from map_layers import add_cluster_layer, add_lazy_cluster_layer, fit_to_events, id_rows, popup_rows, rows_bounds
+from normalize import normalize_events
+from search_index import SearchIndex
+from spatial_index import GridIndex
+from synthetic_events import make_events
+
+# -------------------------------------------------
+# PIPELINE BENCHMARKS (synthetic data, offline)
+# -------------------------------------------------
+# Times fetch → normalize → filter → list HTML → folium map on generated
+# event sets held in an in-memory Firestore stand-in. No network needed.
+#
+# Usage:
+#   python bench.py                       # 1k, 10k, 100k events
+#   python bench.py --sizes 1000 5000 --repeat 5
+#   python bench.py --compare bench_results/<older>.json
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "bench_results")
+
+# Events per list page, as in the app's [list] page_size default
+PAGE_SIZE = 20
+
+
+# -------------------------------------------------
+# TIMING
+# -------------------------------------------------
+def timed(fn, repeat):
+    """(result of the last call, [seconds per call])."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return result, times
+
+
+def _stats(times, **sizes):
+    ms = [t * 1000 for t in times]
+    return {"min_ms": round(min(ms), 3), "median_ms": round(statistics.median(ms), 3), **sizes}
+
+
+def run_size(n, repeat, seed=0):
+    """Benchmark every stage on n synthetic events; returns {stage: stats}."""
+    db = FakeFirestore()
+    db.load(EVENTS_COLLECTION, make_events(n, seed))
+    results = {}
+
+    # FETCH (server-side approved + not-ended filter, paged)
+    since = public_window_start()
+    docs, t = timed(lambda: fetch_public_events(db, since), repeat)
+    results["fetch"] = _stats(t, rows=len(docs))
+
+    # NORMALIZE
+    raw = pd.DataFrame(docs)
+    df, t = timed(lambda: normalize_events(raw), repeat)
+    results["normalize"] = _stats(t, rows=len(df))
+
+    # INDEX BUILDS (once per data version in the app)
+    facets, t = timed(lambda: FacetIndex.from_frame(df), repeat)
+    results["facet_index"] = _stats(t)
+    intervals, t = timed(lambda: IntervalIndex.from_frame(df), repeat)
+    results["interval_index"] = _stats(t)
+    grid, t = timed(lambda: GridIndex.from_frame(df), repeat)
+    results["grid_index"] = _stats(t)
+
+    def build_search():
+        index = SearchIndex()
+        index.sync(1, df)
+        return index
+
+    search, t = timed(build_search, repeat)
+    results["search_index"] = _stats(t)
+
+    # FILTERING (a typical rerun: date window + brand + text search + facet counts)
+    today = datetime.now().date()
+
+    def filter_once():
+        pos = intervals.on_days(today, today + timedelta(days=7))
+        pos = np.intersect1d(pos, facets.positions_of(search.search("kahvi")), assume_unique=True)
+        facets.counts("store_name", pos)
+        pos = facets.restrict(pos, "brand_id", "Paulig")
+        return df.iloc[pos]
+
+    filtered, t = timed(filter_once, repeat)
+    results["filter"] = _stats(t, rows=len(filtered))
+
+    _, t = timed(lambda: intervals.live_at(datetime.now()), repeat)
+    results["live_now"] = _stats(t)
+
+    # LIST HTML (first page; cold = empty HTML cache, warm = second render)
+    page = df.iloc[:PAGE_SIZE].to_dict("records")
+
+    def cold_page():
+        html_cache.clear()
+        return cards_html(page, "fi", "Hyväksytty")
+
+    html, t = timed(cold_page, repeat)
+    results["list_html_cold"] = _stats(t, html_bytes=len(html.encode()))
+    html, t = timed(lambda: cards_html(page, "fi", "Hyväksytty"), repeat)
+    results["list_html_warm"] = _stats(t, html_bytes=len(html.encode()))
+
+    # FOLIUM MAP (construction + HTML render, lazy ids vs embedded popups)
+    mdf = df.dropna(subset=["lat_clean", "lon_clean"])
+
+    def build_map(lazy):
+        m = folium.Map(location=[62.0, 25.0], zoom_start=6, tiles="CartoDB dark_matter")
+        rows = id_rows(mdf) if lazy else popup_rows(mdf, "fi")
+        if lazy:
+            add_lazy_cluster_layer(m, rows)
+        else:
+            add_cluster_layer(m, rows)
+        fit_to_events(m, rows_bounds(rows))
+        return m
+
+    m, t = timed(lambda: build_map(lazy=True), repeat)
+    results["map_build_lazy"] = _stats(t, markers=len(mdf))
+    html, t = timed(lambda: m.get_root().render(), repeat)
+    results["map_render_lazy"] = _stats(t, html_bytes=len(html.encode()))
+
+    html_cache.clear()
+    m, t = timed(lambda: build_map(lazy=False), repeat)
+    results["map_build_popups"] = _stats(t, markers=len(mdf))
+    html, t = timed(lambda: m.get_root().render(), repeat)
+    results["map_render_popups"] = _stats(t, html_bytes=len(html.encode()))
+
+    return results
+
+
+# -------------------------------------------------
+# RESULTS
+# -------------------------------------------------
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(report, directory=RESULTS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, f"{stamp}_{report['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_report(report, baseline=None):
+    for size, stages in report["sizes"].items():
+        print(f"\n== {int(size):,} events ==")
+        old = (baseline or {}).get("sizes", {}).get(size, {})
+        for stage, s in stages.items():
+            extra = " ".join(f"{k}={v}" for k, v in s.items() if not k.endswith("_ms"))
+            line = f"  {stage:<18} {s['median_ms']:>10.2f} ms (min {s['min_ms']:.2f})"
+            if stage in old and old[stage]["median_ms"]:
+                change = s["median_ms"] / old[stage]["median_ms"] - 1
+                line += f"  {change:+.0%} vs {baseline['commit']}"
+            print(f"{line}  {extra}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the event pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage (median is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    parser.add_argument("--no-save", action="store_true", help="print only, do not write bench_results/")
+    args = parser.parse_args(argv)
+
+    # folium nags about CartoDB API keys on every map; irrelevant offline
+    warnings.filterwarnings("ignore", message="CartoDB tiles")
+
+    report = {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "folium": folium.__version__,
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+    for n in args.sizes:
+        print(f"Benchmarking {n:,} events…", file=sys.stderr)
+        report["sizes"][str(n)] = run_size(n, args.repeat, args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+    if not args.no_save:
+        print(f"\nSaved {save_results(report)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
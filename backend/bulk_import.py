@@ -0,0 +1,208 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from event_store import EVENTS_COLLECTION, MAX_BATCH_WRITES, BatchWriteError, commit_in_batches
+from firebase_client import init_db, load_secrets
+from geocoding import Geocoder
+from submissions import TEXT_FIELDS, SubmissionError, build_event_doc, parse_import_row
+
+# -------------------------------------------------
+# BULK EVENT IMPORT (CSV / JSONL campaign schedules)
+# -------------------------------------------------
+# Expected columns / keys (same fields as the form):
+#   product_name, brand_id, store_name, address, city, description,
+#   start_date (YYYY-MM-DD), start_time (HH:MM), end_date, end_time
+# product_name, store_name, address and the four time fields are required.
+#
+# Usage:
+#   python bulk_import.py schedule.csv [--approved] [--dry-run]
+
+GEOCODE_WORKERS = 4
+
+# Network/HTTP errors from Nominatim are retried with exponential backoff
+# (1 s, 2 s, ...) before the address is given up on for this run
+GEOCODE_RETRIES = 3
+GEOCODE_BACKOFF = 1.0
+
+
+def read_rows(path):
+    """Yield (line_number, row_dict) from a .csv or .jsonl file.
+
+    A JSONL line that isn't a JSON object is yielded as a SubmissionError
+    instead, so it is reported as a failed row.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_no, SubmissionError(f"Invalid JSON: {e}")
+                    continue
+                if not isinstance(row, dict):
+                    yield line_no, SubmissionError("Expected a JSON object.")
+                    continue
+                yield line_no, row
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            # Line 1 is the header
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+
+
+def geocode_with_retry(geocoder, address, city, retries=GEOCODE_RETRIES, backoff=GEOCODE_BACKOFF):
+    """(lat, lon), or None when the address really wasn't found.
+
+    Transient errors are retried; if every attempt fails the last error
+    is raised (an unreachable geocoder is not a missing address).
+    """
+    for attempt in range(retries):
+        try:
+            return geocoder.geocode(address, city)
+        except requests.RequestException:
+            if attempt == retries - 1:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def _clean(row):
+    return {k: (str(v).strip() if v is not None else "") for k, v in row.items()}
+
+
+def import_rows(rows, db, geocoder, approved=False, dry_run=False, workers=GEOCODE_WORKERS,
+                retries=GEOCODE_RETRIES, backoff=GEOCODE_BACKOFF):
+    """Validate, geocode and write rows. Returns a report dict.
+
+    Rows are "failed" when they break a rule or their address wasn't
+    found, and "geocode_errors" when the geocoder couldn't be reached
+    (listed separately so only those rows need another run).
+    """
+    t0 = time.perf_counter()
+    rows = list(rows)
+    failures = []
+    geocode_errors = []
+    valid = []
+
+    # 1. Required fields and strict date/time formats
+    for line_no, row in rows:
+        try:
+            if isinstance(row, SubmissionError):
+                raise row
+            row = _clean(row)
+            start_dt, end_dt = parse_import_row(row)
+        except SubmissionError as e:
+            failures.append((line_no, str(e)))
+            continue
+        valid.append((line_no, row, start_dt, end_dt))
+
+    # 2. Geocode each unique address once, concurrently (the geocoder's
+    #    shared token bucket keeps Nominatim at its rate limit)
+    unique = {(row.get("address", ""), row.get("city", "")) for _, row, _, _ in valid}
+
+    def lookup(key):
+        try:
+            return key, geocode_with_retry(geocoder, *key, retries=retries, backoff=backoff)
+        except Exception as e:
+            return key, e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        coords = dict(pool.map(lookup, unique))
+    t_geocoded = time.perf_counter()
+
+    # 3. Build documents
+    writes = []
+    collection = db.collection(EVENTS_COLLECTION)
+    for line_no, row, start_dt, end_dt in valid:
+        found = coords.get((row.get("address", ""), row.get("city", "")))
+        if isinstance(found, Exception):
+            geocode_errors.append((line_no, f"Geocoding failed: {found}"))
+            continue
+        try:
+            doc = build_event_doc(
+                {k: row.get(k, "") for k in TEXT_FIELDS},
+                start_dt,
+                end_dt,
+                found,
+                approved=approved,
+            )
+        except SubmissionError as e:
+            failures.append((line_no, str(e)))
+            continue
+        writes.append(("set", collection.document(), doc))
+
+    # 4. Batched writes (up to 500 per WriteBatch)
+    error = None
+    try:
+        written = 0 if dry_run else commit_in_batches(db, writes, MAX_BATCH_WRITES)
+    except BatchWriteError as e:
+        written, error = e.committed, str(e)
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "rows": len(rows),
+        "valid": len(writes),
+        "written": written,
+        "error": error,
+        "failed": sorted(failures),
+        "geocode_errors": sorted(geocode_errors),
+        "unique_addresses": len(unique),
+        "geocode_seconds": t_geocoded - t0,
+        "seconds": elapsed,
+        "rows_per_second": (len(writes) / elapsed) if elapsed else 0.0,
+    }
+
+
+def print_report(report, dry_run=False):
+    print(f"Rows read:         {report['rows']}")
+    print(f"Valid:             {report['valid']}")
+    print(f"Written:           {report['written']}" + (" (dry run)" if dry_run else ""))
+    print(f"Unique addresses:  {report['unique_addresses']} "
+          f"(geocoded in {report['geocode_seconds']:.1f} s)")
+    print(f"Total time:        {report['seconds']:.1f} s "
+          f"({report['rows_per_second']:.1f} rows/s)")
+
+    if report["error"]:
+        print(f"\nWrite error:       {report['error']}")
+
+    if report["failed"]:
+        print(f"\nFailed rows ({len(report['failed'])}):")
+        for line_no, msg in report["failed"]:
+            print(f"  line {line_no}: {msg}")
+
+    if report["geocode_errors"]:
+        print(f"\nNot imported, geocoder unreachable ({len(report['geocode_errors'])}):")
+        for line_no, msg in report["geocode_errors"]:
+            print(f"  line {line_no}: {msg}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import events from CSV or JSONL.")
+    parser.add_argument("path", help="schedule file (.csv or .jsonl)")
+    parser.add_argument("--approved", action="store_true", help="import as already approved")
+    parser.add_argument("--dry-run", action="store_true", help="validate and geocode only")
+    parser.add_argument("--workers", type=int, default=GEOCODE_WORKERS)
+    args = parser.parse_args(argv)
+
+    db = init_db(load_secrets())
+    report = import_rows(
+        read_rows(args.path),
+        db,
+        Geocoder(),
+        approved=args.approved,
+        dry_run=args.dry_run,
+        workers=args.workers,
+    )
+    print_report(report, dry_run=args.dry_run)
+    return 1 if report["failed"] or report["geocode_errors"] or report["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
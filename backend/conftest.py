@@ -0,0 +1,3 @@
+# firebase_test.py and test_setup.py are scripts, not tests: the first writes
+# a real document to Firestore, so pytest must never import it.
+collect_ignore = ["firebase_test.py", "test_setup.py"]
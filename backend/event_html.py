@@ -0,0 +1,192 @@
+import html
+
+from lru import LruCache
+
+# -------------------------------------------------
+# EVENT HTML TEMPLATES (list card + map popup)
+# -------------------------------------------------
+# Stored image sizes, smallest first (see images.VARIANTS)
+IMAGE_VARIANTS = ["thumb", "card"]
+
+
+def _valid_image(img_url):
+    # Only absolute http(s) URLs, so a submitted "javascript:" or data: URL
+    # never ends up in a src attribute
+    return isinstance(img_url, str) and img_url.startswith(("https://", "http://"))
+
+
+def _text(event, field):
+    """Escaped display text of a field: events are user-submitted, never trusted as HTML."""
+    value = event.get(field)
+    return "" if value is None else html.escape(str(value))
+
+
+def pick_image(event, variant):
+    """URL of `variant` or the next larger one, falling back to the legacy image_url."""
+    urls = event.get("image_urls")
+    if isinstance(urls, dict):
+        for name in IMAGE_VARIANTS[IMAGE_VARIANTS.index(variant):]:
+            if urls.get(name):
+                return urls[name]
+    return event.get("image_url")
+
+
+def card_html(event, approved_label) -> str:
+    """List-tab card for one event (dict or Series from normalize_events)."""
+    img_url = pick_image(event, "card")
+
+    if not _valid_image(img_url):
+        img_html = """
+        <div style="width:100%; height:180px; background:#333;
+                    border-radius:10px; display:flex; justify-content:center;
+                    align-items:center; color:#bbb; font-size:0.9rem;">
+            No image
+        </div>
+        """
+    else:
+        img_html = f"""
+        <img src="{html.escape(img_url)}" style="width:100%; height:180px; object-fit:cover;
+             border-radius:10px;" onerror="this.style.display='none';" loading="lazy" />
+        """
+
+    return f"""
+    <div style="border-radius:12px; border:1px solid #333; padding:16px;
+                margin-bottom:18px; background-color:#1e1e1e; color:#f2f2f2;">
+
+        {img_html}
+
+        <div style="margin-top:10px; display:flex; justify-content:space-between;
+                    align-items:center;">
+
+            <div style="font-weight:700; font-size:1.15rem;">
+                {_text(event, 'product_name')}
+                <span style="font-weight:400; color:#bbbbbb;">
+                    {(" – " + _text(event, 'brand_id')) if event.get('brand_id') else ""}
+                </span>
+            </div>
+
+            <div style="font-size:0.75rem; padding:3px 10px; border-radius:999px;
+                        background-color:#00c85333; color:#00c853;
+                        border:1px solid #00c85355; font-weight:600;">
+                {approved_label}
+            </div>
+        </div>
+
+        <div style="color:#ccc; margin-top:6px;">
+            {_text(event, 'store_name')} • {_text(event, 'address')}, {_text(event, 'city')}
+        </div>
+
+        <div style="color:#aaa; margin-top:6px;">
+            {_text(event, 'start_fmt')} – {_text(event, 'end_fmt')}
+        </div>
+
+        <div style="margin-top:10px; color:#e0e0e0;">
+            {_text(event, 'description')}
+        </div>
+
+    </div>
+    """
+
+
+def cards_html(events, lang, approved_label) -> str:
+    """All cards of one list page as a single HTML block (one st.html element)."""
+    return "".join(cached_card_html(event, lang, approved_label) for event in events)
+
+
+def popup_html(event) -> str:
+    """Dark popup card for one event (dict or Series from normalize_events)."""
+    img_url = pick_image(event, "thumb")
+    if _valid_image(img_url):
+        thumb_html = f"""
+            <img src="{html.escape(img_url)}"
+                 style="width:100%; height:150px; object-fit:cover;
+                        border-radius:10px; margin-bottom:10px;" />
+        """
+    else:
+        thumb_html = """
+            <div style="width:100%; height:150px; background:#333;
+                        border-radius:10px; margin-bottom:10px;
+                        display:flex; justify-content:center; align-items:center;
+                        color:#bbb; font-size:0.9rem;">
+                No image
+            </div>
+        """
+
+    return f"""
+    <div style="
+        font-size:14px;
+        line-height:1.6;
+        background:#1e1e1e;
+        color:#f2f2f2;
+        padding:16px;
+        border-radius:12px;
+        width:240px;
+        overflow:hidden;
+    ">
+        {thumb_html}
+
+        <div style="font-size:16px; font-weight:700; color:#ffffff;">
+            {_text(event, 'product_name')}
+        </div>
+
+        <div style="color:#bbbbbb; margin-bottom:8px;">
+            {_text(event, 'brand_id')}
+        </div>
+
+        <div style="margin-bottom:6px; color:#e0e0e0;">
+            <b>{_text(event, 'store_name')}</b><br>
+            {_text(event, 'address')}, {_text(event, 'city')}
+        </div>
+
+        <div style="color:#cccccc; margin-bottom:8px;">
+            <b>{_text(event, 'start_fmt')}</b> – <b>{_text(event, 'end_fmt')}</b>
+        </div>
+
+        <div style="color:#dddddd;">
+            {_text(event, 'description')}
+        </div>
+    </div>
+    """
+
+
+# -------------------------------------------------
+# MEMOIZED HTML (process-wide, bounded LRU)
+# -------------------------------------------------
+HTML_CACHE_SIZE = 5000
+
+
+class HtmlCache(LruCache):
+    """LRU of rendered HTML keyed by (kind, doc id, content hash, lang)."""
+
+    def __init__(self, maxsize=HTML_CACHE_SIZE):
+        super().__init__(maxsize)
+
+    def get_or_render(self, key, render):
+        return self.get_or_build(key, render)[0]
+
+
+# Module-level, so it survives Streamlit reruns and is shared by all sessions
+html_cache = HtmlCache()
+
+
+def _cache_key(kind, event, lang):
+    """None when the event lacks an id/content_hash (then it is not cached)."""
+    doc_id = event.get("id")
+    content_hash = event.get("content_hash")
+    if doc_id is None or content_hash is None:
+        return None
+    return (kind, doc_id, content_hash, lang)
+
+
+def cached_card_html(event, lang, approved_label) -> str:
+    key = _cache_key("card", event, lang)
+    if key is None:
+        return card_html(event, approved_label)
+    return html_cache.get_or_render(key, lambda: card_html(event, approved_label))
+
+
+def cached_popup_html(event, lang) -> str:
+    key = _cache_key("popup", event, lang)
+    if key is None:
+        return popup_html(event)
+    return html_cache.get_or_render(key, lambda: popup_html(event))
@@ -0,0 +1,253 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from normalize import local_now
+
+EVENTS_COLLECTION = "events"
+
+# Documents fetched per round trip when paging through a query
+QUERY_PAGE_SIZE = 500
+
+# Firestore's limit on operations in one WriteBatch
+MAX_BATCH_WRITES = 500
+
+
+# -------------------------------------------------
+# FIRESTORE QUERIES
+# -------------------------------------------------
+def stream_paged(query, order_field, page_size=QUERY_PAGE_SIZE):
+    """Yield documents of a query page by page using start_after cursors."""
+    query = query.order_by(order_field)
+    cursor = None
+
+    while True:
+        page = query.limit(page_size)
+        if cursor is not None:
+            page = page.start_after(cursor)
+
+        docs = list(page.stream())
+        yield from docs
+
+        if len(docs) < page_size:
+            return
+        cursor = docs[-1]
+
+
+def _to_dicts(snapshots):
+    docs = []
+    for e in snapshots:
+        doc = e.to_dict()
+        doc["id"] = e.id
+        docs.append(doc)
+    return docs
+
+
+def public_window_start(lookback_days=0, now=None):
+    """Lower bound for end_time: midnight today, minus an optional lookback."""
+    now = now or local_now()
+    midnight = datetime.combine(now.date(), datetime.min.time())
+    return midnight - timedelta(days=lookback_days)
+
+
+def fetch_public_events(db, since, collection=EVENTS_COLLECTION, page_size=QUERY_PAGE_SIZE):
+    """Approved events that end on/after `since`, filtered server-side.
+
+    Needs the (approved, end_time) composite index from
+    firestore.indexes.json. Legacy docs with string times are not matched
+    by the range filter; run migrate_times.py once to convert them.
+    """
+    # Imported here: the google-cloud stack is slow to load and most
+    # reruns never build a query (see app.py)
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    query = (
+        db.collection(collection)
+        .where(filter=FieldFilter("approved", "==", True))
+        .where(filter=FieldFilter("end_time", ">=", since))
+    )
+    return _to_dicts(stream_paged(query, "end_time", page_size))
+
+
+def fetch_events_page(db, approved, page_size, after_id=None, collection=EVENTS_COLLECTION):
+    """One page of events with the given approval state, ordered by document id.
+
+    Returns (docs, has_more). Pass the last doc id of the previous page as
+    `after_id` to continue from there.
+    """
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    query = (
+        db.collection(collection)
+        .where(filter=FieldFilter("approved", "==", approved))
+        .order_by("__name__")
+        .limit(page_size + 1)
+    )
+    if after_id:
+        query = query.start_after({"__name__": after_id})
+
+    docs = _to_dicts(query.stream())
+    return docs[:page_size], len(docs) > page_size
+
+
+# -------------------------------------------------
+# BATCHED WRITES
+# -------------------------------------------------
+class BatchWriteError(RuntimeError):
+    """A WriteBatch commit failed; `committed` writes before it went through."""
+
+    def __init__(self, committed, cause):
+        super().__init__(f"Batch commit failed after {committed} write(s): {cause}")
+        self.committed = committed
+
+
+def commit_in_batches(db, writes, batch_size=MAX_BATCH_WRITES):
+    """Apply ("set" | "update" | "delete", doc_ref, data) writes in WriteBatch chunks.
+
+    Returns the number of writes committed. A failing chunk raises
+    BatchWriteError; chunks before it stay committed.
+    """
+    batch = db.batch()
+    pending = 0
+    committed = 0
+
+    for op, ref, data in writes:
+        if op == "set":
+            batch.set(ref, data)
+        elif op == "update":
+            batch.update(ref, data)
+        elif op == "delete":
+            batch.delete(ref)
+        else:
+            raise ValueError(f"Unknown write op: {op}")
+
+        pending += 1
+        if pending == batch_size:
+            _commit(batch, committed)
+            committed += pending
+            batch = db.batch()
+            pending = 0
+
+    if pending:
+        _commit(batch, committed)
+        committed += pending
+
+    return committed
+
+
+def _commit(batch, committed):
+    try:
+        batch.commit()
+    except Exception as e:
+        raise BatchWriteError(committed, e) from e
+
+
+def set_approved(db, doc_ids, approved=True, collection=EVENTS_COLLECTION):
+    """Approve (or un-approve) many events in batched writes."""
+    col = db.collection(collection)
+    return commit_in_batches(db, (("update", col.document(i), {"approved": approved}) for i in doc_ids))
+
+
+def delete_events(db, doc_ids, collection=EVENTS_COLLECTION):
+    """Delete many events in batched writes."""
+    col = db.collection(collection)
+    return commit_in_batches(db, (("delete", col.document(i), None) for i in doc_ids))
+
+
+# -------------------------------------------------
+# SHARED EVENT SNAPSHOT (PROCESS-WIDE CACHE)
+# -------------------------------------------------
+class EventSnapshot:
+    """Process-wide cached result of an events query, with a TTL.
+
+    `loader` is a zero-argument callable returning a list of event dicts
+    (each with an "id" key). `prepare`, if given, turns the raw DataFrame
+    into the one handed to the views (e.g. normalize_events) and runs once
+    per data version rather than once per rerun. One instance is shared by
+    every session (see app.py). Deletes done by the app go through
+    remove() so the cached copy stays correct without a full refetch;
+    approvals invalidate() it, since the approved docs have to come back
+    from the public query anyway.
+    """
+
+    def __init__(self, loader, ttl_seconds=60, prepare=None):
+        self.loader = loader
+        self.prepare = prepare
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+
+        self._lock = threading.RLock()
+        self._docs = None
+        self._loaded_at = 0.0
+        self._frame = None
+        self._frame_version = -1
+        self._derived = {}
+
+    # ---------- loading ----------
+    def _is_stale(self):
+        return self._docs is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def _load(self):
+        self._docs = {doc["id"]: doc for doc in self.loader()}
+        self._loaded_at = time.monotonic()
+        self.version += 1
+
+    def docs(self):
+        """Return a list of event dicts, reloading if the TTL has expired."""
+        with self._lock:
+            if self._is_stale():
+                self._load()
+            return list(self._docs.values())
+
+    def view(self):
+        """Return (version, frame): the (prepared) snapshot and the version it belongs to.
+
+        Read both from the same call and pass the pair to derived(), so
+        positions from an index always refer to the frame in hand even if
+        the snapshot reloads or changes mid-rerun. The frame is built once
+        per version.
+        """
+        with self._lock:
+            if self._is_stale():
+                self._load()
+            if self._frame_version != self.version:
+                df = pd.DataFrame(list(self._docs.values()))
+                self._frame = self.prepare(df) if self.prepare else df
+                self._frame_version = self.version
+            return self._frame_version, self._frame
+
+    def frame(self):
+        """Return the (prepared) snapshot as a DataFrame (see view())."""
+        return self.view()[1]
+
+    def derived(self, key, build, view):
+        """Return build(frame) for a (version, frame) pair from view() (indexes, facets, ...).
+
+        Cached per version. A pair that is no longer current gets an index
+        built for its own frame, which is not kept.
+        """
+        version, frame = view
+        with self._lock:
+            cached = self._derived.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            result = build(frame)
+            if version == self._frame_version:
+                self._derived[key] = (version, result)
+            return result
+
+    # ---------- write-through ----------
+    def remove(self, doc_id):
+        """Drop a cached doc after it was deleted in Firestore."""
+        with self._lock:
+            if self._docs is None or doc_id not in self._docs:
+                return
+            del self._docs[doc_id]
+            self.version += 1
+
+    def invalidate(self):
+        """Force the next read to refetch from Firestore."""
+        with self._lock:
+            self._docs = None
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# FILTER FACETS (built once per data version)
+# -------------------------------------------------
+FACET_FIELDS = ("brand_id", "store_name", "city")
+
+
+class FacetIndex:
+    """Per-field value codes + counts and the date range of a snapshot frame.
+
+    Filters work on row positions into the frame the index was built from.
+    Counts for a narrowed set are a bincount over just those positions, so
+    the dropdowns can show "Valio (12)" for the current selection without
+    re-sorting or re-scanning the string columns.
+    """
+
+    def __init__(self, df, fields=FACET_FIELDS):
+        self.size = 0 if df is None else len(df)
+        self.values = {}     # field -> sorted list of distinct values
+        self.codes = {}      # field -> int array (position in values, -1 = missing)
+        self.totals = {}     # field -> {value: count} over all rows
+        self._code_of = {}   # field -> {value: code}
+
+        for field in fields:
+            if self.size and field in df:
+                col = df[field].where(df[field].map(lambda v: isinstance(v, str) and v != ""))
+                codes, uniques = pd.factorize(col, sort=True)
+            else:
+                codes, uniques = np.full(self.size, -1), []
+            self.codes[field] = np.asarray(codes)
+            self.values[field] = list(uniques)
+            self._code_of[field] = {v: i for i, v in enumerate(self.values[field])}
+            self.totals[field] = self.counts(field, np.arange(self.size))
+
+        if self.size:
+            self.ids = df["id"].to_numpy()
+            self._pos_of_id = {doc_id: i for i, doc_id in enumerate(self.ids)}
+            self.start_days = df["start_date_clean"].to_numpy()
+            self.end_days = df["end_date_clean"].to_numpy()
+        else:
+            self.ids = np.empty(0, dtype=object)
+            self._pos_of_id = {}
+            self.start_days = self.end_days = np.empty(0, dtype="datetime64[ns]")
+
+        valid_starts = self.start_days[~np.isnat(self.start_days)]
+        valid_ends = self.end_days[~np.isnat(self.end_days)]
+        self.min_date = pd.Timestamp(valid_starts.min()).date() if len(valid_starts) else None
+        self.max_date = pd.Timestamp(valid_ends.max()).date() if len(valid_ends) else None
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df)
+
+    # ---------- narrowing ----------
+    def positions_of(self, doc_ids):
+        """Sorted positions for a set of doc ids (ids not in the frame are ignored)."""
+        return np.sort(np.fromiter(
+            (self._pos_of_id[i] for i in doc_ids if i in self._pos_of_id), dtype=np.int64
+        ))
+
+    def restrict(self, positions, field, value):
+        """Keep positions whose `field` equals `value` (no-op for an empty value)."""
+        if not value:
+            return positions
+        code = self._code_of[field].get(value, -2)
+        return positions[self.codes[field][positions] == code]
+
+    # ---------- counting ----------
+    def counts(self, field, positions):
+        """{value: count} over `positions` only."""
+        codes = self.codes[field][positions]
+        codes = codes[codes >= 0]
+        n = np.bincount(codes, minlength=len(self.values[field]))
+        return {v: int(c) for v, c in zip(self.values[field], n) if c}
@@ -0,0 +1,241 @@
+import copy
+import itertools
+import threading
+import uuid
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+# -------------------------------------------------
+# IN-MEMORY FIRESTORE STAND-IN (benchmarks / offline runs)
+# -------------------------------------------------
+# Covers the subset of the google-cloud-firestore client this app uses:
+# collection().document(), where(filter=FieldFilter), order_by, limit,
+# start_after, stream, get, batch. Values compare like Firestore does:
+# only within the same type, so a datetime range filter skips string
+# times, and datetimes come back timezone-aware (UTC).
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+# Firestore's cross-type ordering (null < bool < number < timestamp < string)
+_TYPE_RANK = {type(None): 0, bool: 1, int: 2, float: 2, datetime: 3, str: 4}
+
+
+def _to_utc(value):
+    """Store datetimes the way Firestore returns them (aware, UTC)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    if isinstance(value, dict):
+        return {k: _to_utc(v) for k, v in value.items()}
+    return value
+
+
+def _rank(value):
+    for t in type(value).__mro__:
+        if t in _TYPE_RANK:
+            return _TYPE_RANK[t]
+    return 5
+
+
+def _matches(value, op, target):
+    value, target = _to_utc(value), _to_utc(target)
+    if op in ("==", "!="):
+        return _OPS[op](value, target)
+    if _rank(value) != _rank(target):
+        return False
+    return _OPS[op](value, target)
+
+
+class FakeSnapshot:
+    def __init__(self, ref, data):
+        self.reference = ref
+        self.id = ref.id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return copy.deepcopy(self._data.get(field)) if self._data else None
+
+
+class FakeDocumentRef:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self):
+        return FakeSnapshot(self, self._collection._docs.get(self.id))
+
+    def set(self, data):
+        with self._collection._db._lock:
+            self._collection._docs[self.id] = _to_utc(copy.deepcopy(data))
+            self._collection._version += 1
+
+    def update(self, data):
+        with self._collection._db._lock:
+            if self.id not in self._collection._docs:
+                raise KeyError(f"No document to update: {self.id}")
+            self._collection._docs[self.id].update(_to_utc(copy.deepcopy(data)))
+            self._collection._version += 1
+
+    def delete(self):
+        with self._collection._db._lock:
+            self._collection._docs.pop(self.id, None)
+            self._collection._version += 1
+
+
+class FakeQuery:
+    def __init__(self, collection, filters=(), order=None, limit_n=None, after=None):
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._order = order
+        self._limit = limit_n
+        self._after = after
+
+    def _copy(self, **changes):
+        args = {
+            "filters": self._filters,
+            "order": self._order,
+            "limit_n": self._limit,
+            "after": self._after,
+        }
+        args.update(changes)
+        return FakeQuery(self._collection, **args)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field):
+        return self._copy(order=field)
+
+    def limit(self, n):
+        return self._copy(limit_n=n)
+
+    def start_after(self, cursor):
+        """Cursor: a snapshot from a previous page or {"__name__": doc_id}."""
+        if isinstance(cursor, dict):
+            cursor = self._collection.document(cursor["__name__"]).get()
+        return self._copy(after=cursor)
+
+    def _sort_key(self, doc_id, data):
+        if self._order in (None, "__name__"):
+            return (doc_id,)
+        value = data.get(self._order)
+        return (_rank(value), value, doc_id)
+
+    def _sorted_rows(self):
+        """(sort keys, rows) matching the filters, cached until the next write.
+
+        Paging through a big collection re-runs the same query once per page;
+        the cache keeps that linear instead of re-sorting everything each time.
+        """
+        col = self._collection
+        cache_key = (self._filters, self._order)
+        with col._db._lock:
+            cached = col._query_cache.get(cache_key)
+            if cached and cached[0] == col._version:
+                return cached[1], cached[2]
+
+            rows = [
+                (doc_id, data) for doc_id, data in col._docs.items()
+                if all(f in data and _matches(data[f], op, v) for f, op, v in self._filters)
+            ]
+            # Ordering by a field drops documents without it, like Firestore
+            if self._order not in (None, "__name__"):
+                rows = [(i, d) for i, d in rows if self._order in d]
+            rows.sort(key=lambda r: self._sort_key(*r))
+            keys = [self._sort_key(*r) for r in rows]
+
+            col._query_cache[cache_key] = (col._version, keys, rows)
+            return keys, rows
+
+    def stream(self):
+        keys, rows = self._sorted_rows()
+
+        start = 0
+        if self._after is not None:
+            start = bisect_right(keys, self._sort_key(self._after.id, self._after._data or {}))
+        end = len(rows) if self._limit is None else start + self._limit
+
+        for doc_id, data in rows[start:end]:
+            yield FakeSnapshot(self._collection.document(doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, name):
+        self._db = db
+        self.name = name
+        self._docs = {}
+        self._version = 0
+        self._query_cache = {}
+        super().__init__(self)
+
+    def document(self, doc_id=None):
+        return FakeDocumentRef(self, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+
+class FakeBatch:
+    def __init__(self):
+        self._ops = []
+
+    def set(self, ref, data):
+        self._ops.append(lambda: ref.set(data))
+
+    def update(self, ref, data):
+        self._ops.append(lambda: ref.update(data))
+
+    def delete(self, ref):
+        self._ops.append(ref.delete)
+
+    def commit(self):
+        ops, self._ops = self._ops, []
+        for op in ops:
+            op()
+
+
+class FakeFirestore:
+    """Drop-in for firestore.client() in benchmarks and offline runs."""
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.RLock()
+
+    def collection(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FakeCollection(self, name)
+            return self._collections[name]
+
+    def batch(self):
+        return FakeBatch()
+
+    def load(self, collection, docs):
+        """Bulk insert dicts (an "id" key, if present, becomes the doc id)."""
+        col = self.collection(collection)
+        ids = (f"doc{i:08d}" for i in itertools.count())
+        with self._lock:
+            for doc in docs:
+                doc = dict(doc)
+                doc_id = doc.pop("id", None) or next(ids)
+                col._docs[doc_id] = _to_utc(doc)
+            col._version += 1
+        return col
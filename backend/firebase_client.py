@@ -0,0 +1,74 @@
+import os
+import tomllib
+
+# -------------------------------------------------
+# FIREBASE INIT (shared by app.py and offline scripts)
+# -------------------------------------------------
+STORAGE_BUCKET = "maistiaisetmap-images"
+
+SECRETS_PATH = os.path.join(os.path.dirname(__file__), ".streamlit", "secrets.toml")
+
+
+def load_secrets(path=SECRETS_PATH):
+    """Read secrets.toml for scripts that run outside Streamlit."""
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def init_firebase(firebase_config):
+    """Initialize the default Firebase app once and return a Firestore client."""
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(
+            {
+                "type": firebase_config["type"],
+                "project_id": firebase_config["project_id"],
+                "private_key_id": firebase_config["private_key_id"],
+                "private_key": firebase_config["private_key"],
+                "client_email": firebase_config["client_email"],
+                "client_id": firebase_config["client_id"],
+                "auth_uri": firebase_config["auth_uri"],
+                "token_uri": firebase_config["token_uri"],
+                "auth_provider_x509_cert_url": firebase_config["auth_provider_x509_cert_url"],
+                "client_x509_cert_url": firebase_config["client_x509_cert_url"],
+                "universe_domain": firebase_config.get("universe_domain", "googleapis.com"),
+            }
+        )
+        firebase_admin.initialize_app(
+            cred,
+            {
+                "storageBucket": STORAGE_BUCKET,
+            },
+        )
+
+    return firestore.client()
+
+
+def init_db(secrets):
+    """Firestore client for [backend] mode = "firestore" (default), "emulator" or "fake".
+
+    "emulator" talks to a local Firestore emulator at [backend] emulator_host
+    (no credentials needed). "fake" is the in-memory FakeFirestore seeded
+    with [backend] fake_events synthetic events, for fully offline runs.
+    """
+    backend = secrets.get("backend", {})
+    mode = backend.get("mode", "firestore")
+
+    if mode == "fake":
+        from fake_firestore import FakeFirestore
+        from synthetic_events import make_events
+        from event_store import EVENTS_COLLECTION
+
+        db = FakeFirestore()
+        db.load(EVENTS_COLLECTION, make_events(backend.get("fake_events", 500)))
+        return db
+
+    if mode == "emulator":
+        from google.cloud import firestore as gcloud_firestore
+
+        os.environ["FIRESTORE_EMULATOR_HOST"] = backend.get("emulator_host", "localhost:8080")
+        return gcloud_firestore.Client(project=backend.get("project_id", "demo-maistiaiset"))
+
+    return init_firebase(secrets["firebase"])
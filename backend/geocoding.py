@@ -0,0 +1,166 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# -------------------------------------------------
+# GEOCODING (Nominatim, cached + rate limited)
+# -------------------------------------------------
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "MaistiaisetMap/1.0"
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), ".cache", "geocode.sqlite")
+
+# Found addresses rarely move; misses are retried sooner in case of typos fixed upstream
+POSITIVE_TTL = 90 * 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+
+
+def normalize_key(address, city):
+    """Cache key for an (address, city) pair: case/space/punctuation-insensitive."""
+    def clean(s):
+        s = (s or "").casefold()
+        s = re.sub(r"[,.;]+", " ", s)
+        return " ".join(s.split())
+
+    return f"{clean(address)}|{clean(city)}"
+
+
+# -------------------------------------------------
+# RATE LIMITER
+# -------------------------------------------------
+class TokenBucket:
+    """Thread-safe token bucket. Nominatim's policy is at most 1 request/second."""
+
+    def __init__(self, rate=1.0, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# -------------------------------------------------
+# PERSISTENT CACHE (SQLite on disk)
+# -------------------------------------------------
+_MISSING = object()
+
+
+class GeocodeCache:
+    """On-disk cache of geocode results, including misses (lat/lon NULL)."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " key TEXT PRIMARY KEY, lat REAL, lon REAL, stored_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        """(lat, lon), None for a cached miss, or _MISSING if not cached/expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lon, stored_at FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return _MISSING
+
+        lat, lon, stored_at = row
+        ttl = self.negative_ttl if lat is None else self.ttl
+        if time.time() - stored_at > ttl:
+            return _MISSING
+        return None if lat is None else (lat, lon)
+
+    def put(self, key, coords):
+        lat, lon = coords if coords else (None, None)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (key, lat, lon, stored_at) VALUES (?, ?, ?, ?)",
+                (key, lat, lon, time.time()),
+            )
+
+
+# -------------------------------------------------
+# HTTP BACKEND (swappable, e.g. a local stub in tests)
+# -------------------------------------------------
+class NominatimBackend:
+    """Nominatim search over a pooled requests.Session.
+
+    Returns (lat, lon) or None when nothing matched. Network/HTTP errors
+    raise, so they are not cached as misses.
+    """
+
+    def __init__(self, base_url=NOMINATIM_URL, session=None, timeout=10, pool_size=4):
+        self.base_url = base_url
+        self.timeout = timeout
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+        self.session = session
+
+    def search(self, address, city):
+        params = {
+            "q": ", ".join(part for part in (address, city, "Finland") if part),
+            "format": "json",
+            "limit": 1,
+            "addressdetails": 1,
+            "countrycodes": "fi",
+        }
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+
+        data = response.json()
+        if not data:
+            return None
+        return float(data[0]["lat"]), float(data[0]["lon"])
+
+
+class Geocoder:
+    """Cache → rate limiter → backend. Safe to share between threads/sessions."""
+
+    def __init__(self, backend=None, cache=None, limiter=None):
+        self.backend = backend or NominatimBackend()
+        self.cache = cache or GeocodeCache()
+        self.limiter = limiter or TokenBucket(rate=1.0, capacity=1)
+
+    def geocode(self, address, city):
+        """Return (lat, lon) or None. Raises if the backend could not be reached."""
+        key = normalize_key(address, city)
+
+        cached = self.cache.get(key)
+        if cached is not _MISSING:
+            return cached
+
+        self.limiter.acquire()
+        coords = self.backend.search(address, city)
+        self.cache.put(key, coords)
+        return coords
@@ -0,0 +1,106 @@
+import io
+
+from PIL import Image, ImageOps
+
+# -------------------------------------------------
+# IMAGE PIPELINE (decode once → resized WebP variants)
+# -------------------------------------------------
+# name: (max width, max height, WebP quality). Sizes are ~2x the CSS box
+# they are shown in, so they stay sharp on phone screens. Keep in sync with
+# event_html.IMAGE_VARIANTS.
+VARIANTS = {
+    "thumb": (480, 360, 70),    # map popup, 240 x 150 px
+    "card": (960, 720, 78),     # list card, full width x 180 px
+}
+
+# Refuse absurdly large uploads (decompression bombs) before decoding them
+Image.MAX_IMAGE_PIXELS = 40_000_000
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+
+
+def _to_srgb(img):
+    """Convert pixels from an embedded ICC profile (e.g. iPhone Display P3) to sRGB.
+
+    The profile itself is not written out, so without this wide-gamut
+    photos would look washed out. Without a profile the image is left as
+    is; a profile Pillow can't use (broken, or not matching the pixels,
+    e.g. a grayscale profile on a converted grayscale PNG) falls back to
+    a plain conversion.
+    """
+    icc = img.info.get("icc_profile")
+    if not icc:
+        return img
+    mode = "RGBA" if img.mode == "RGBA" else "RGB"
+    try:
+        from PIL import ImageCms
+    except ImportError:
+        return img.convert(mode)
+    try:
+        return ImageCms.profileToProfile(
+            img,
+            ImageCms.ImageCmsProfile(io.BytesIO(icc)),
+            ImageCms.createProfile("sRGB"),
+            outputMode=mode,
+        )
+    except (OSError, ImageCms.PyCMSError):
+        return img.convert(mode)
+
+
+def decode_image(data: bytes) -> Image.Image:
+    """Decode an upload once: apply EXIF rotation, convert to sRGB, flatten alpha onto white."""
+    img = Image.open(io.BytesIO(data))
+    img = ImageOps.exif_transpose(img)
+
+    if _has_alpha(img):
+        img = img.convert("RGBA")
+    elif img.mode not in ("RGB", "CMYK"):
+        img = img.convert("RGB")
+    img = _to_srgb(img)
+
+    if img.mode == "RGBA":
+        # Transparent PNGs on white (a plain RGB convert would make it black)
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+
+    # EXIF/GPS/ICC may still sit in .info; encode_variant's save() isn't
+    # given them, so they are not written to the variants
+    return img.convert("RGB")
+
+
+def encode_variant(img: Image.Image, max_width, max_height, quality) -> bytes:
+    """Resized (never upscaled) WebP copy of `img`."""
+    out = img.copy()
+    out.thumbnail((max_width, max_height), Image.LANCZOS)
+
+    buf = io.BytesIO()
+    out.save(buf, format="WEBP", quality=quality, method=4)
+    return buf.getvalue()
+
+
+def make_variants(data: bytes, pool=None) -> dict:
+    """All VARIANTS of an upload as {name: webp_bytes}, encoded on `pool` if given."""
+    img = decode_image(data)
+
+    if pool is None:
+        return {name: encode_variant(img, *spec) for name, spec in VARIANTS.items()}
+
+    futures = {name: pool.submit(encode_variant, img, *spec) for name, spec in VARIANTS.items()}
+    return {name: f.result() for name, f in futures.items()}
+
+
+def upload_variants(bucket, doc_id, variants: dict) -> dict:
+    """Upload variants to events/{doc_id}/{name}.webp and return {name: public_url}."""
+    urls = {}
+    for name, data in variants.items():
+        blob = bucket.blob(f"events/{doc_id}/{name}.webp")
+        # An event's image is uploaded once, so the object can be cached for long
+        blob.cache_control = "public, max-age=31536000, immutable"
+        blob.upload_from_string(data, content_type="image/webp")
+        # Uniform bucket-level access → no ACL allowed
+        urls[name] = blob.public_url
+    return urls
+
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# TIME-WINDOW INDEX (events sorted by start time)
+# -------------------------------------------------
+_NS_PER_HOUR = 3_600_000_000_000
+
+
+def _ns(t) -> int:
+    """datetime / date / Timestamp → int64 nanoseconds (naive wall-clock time)."""
+    return pd.Timestamp(t).value
+
+
+class IntervalIndex:
+    """(start, end) intervals sorted by start, with the longest duration kept.
+
+    Any event overlapping [t0, t1] must start in [t0 - max_duration, t1], so
+    an overlap query is two binary searches plus an end-time check over that
+    slice only. Events are short (hours to days), which keeps the slice small.
+    Rows with a missing start or end are left out, like the date filters did.
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype="datetime64[ns]")
+        ends = np.asarray(ends, dtype="datetime64[ns]")
+        valid = ~(np.isnat(starts) | np.isnat(ends))
+
+        positions = np.flatnonzero(valid)
+        s = starts[valid].view("int64")
+        e = ends[valid].view("int64")
+
+        order = np.argsort(s, kind="stable")
+        self._positions = positions[order]
+        self._starts = s[order]
+        self._ends = e[order]
+        self._max_duration = int(max((e - s).max(), 0)) if len(s) else 0
+
+    @classmethod
+    def from_frame(cls, df):
+        """Index over a normalize_events frame; results are row positions in it."""
+        if df is None or df.empty:
+            return cls([], [])
+        return cls(df["start_dt"].to_numpy(), df["end_dt"].to_numpy())
+
+    def __len__(self):
+        return len(self._starts)
+
+    # ---------- queries (all return sorted row positions) ----------
+    def overlapping(self, t0, t1):
+        """Events running at any moment of [t0, t1] (start <= t1 and end >= t0)."""
+        t0, t1 = _ns(t0), _ns(t1)
+        lo = np.searchsorted(self._starts, t0 - self._max_duration, side="left")
+        hi = np.searchsorted(self._starts, t1, side="right")
+        hit = self._ends[lo:hi] >= t0
+        return np.sort(self._positions[lo:hi][hit])
+
+    def live_at(self, t):
+        """Events going on at time t."""
+        return self.overlapping(t, t)
+
+    def starting_within(self, t, hours):
+        """Events starting in [t, t + hours] (a plain slice, no end check needed)."""
+        t = _ns(t)
+        lo = np.searchsorted(self._starts, t, side="left")
+        hi = np.searchsorted(self._starts, t + int(hours * _NS_PER_HOUR), side="right")
+        return np.sort(self._positions[lo:hi])
+
+    def on_days(self, date_from, date_to):
+        """Events touching any calendar day in [date_from, date_to]."""
+        end = pd.Timestamp(date_to) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+        return self.overlapping(pd.Timestamp(date_from), end)
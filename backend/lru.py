@@ -0,0 +1,47 @@
+import threading
+from collections import OrderedDict
+
+# -------------------------------------------------
+# BOUNDED LRU CACHE (process-wide, thread-safe)
+# -------------------------------------------------
+# Used for rendered card/popup HTML (event_html.py) and map marker rows
+# (app.py). Values are built outside the lock, so two sessions missing the
+# same key at once may both build it; the last one stored wins.
+
+
+class LruCache:
+    """Thread-safe LRU with hit/miss counters. None is never stored."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        """Return (value, hit): the cached value, or build() stored under key."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value, True
+
+        value = build()
+
+        with self._lock:
+            self.misses += 1
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value, False
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
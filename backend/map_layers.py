@@ -0,0 +1,214 @@
+import json
+
+import folium
+from branca.element import MacroElement
+from folium.plugins import FastMarkerCluster, LocateControl, MarkerCluster
+from jinja2 import Template
+
+from event_html import cached_popup_html
+from spatial_index import radius_box
+
+# -------------------------------------------------
+# MAP LAYERS (violet event markers)
+# -------------------------------------------------
+MARKER_COLOR = "#9C27B0"
+MARKER_RADIUS = 10
+
+# "Near me" point and search radius
+USER_COLOR = "#2196F3"
+
+# Builds one violet circle marker per data row [lat, lon, popup_html] in the
+# browser. Markers only reach the DOM when their cluster is expanded.
+CLUSTER_CALLBACK = f"""
+var callback = function (row) {{
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {{
+        radius: {MARKER_RADIUS},
+        color: "{MARKER_COLOR}",
+        fill: true,
+        fillColor: "{MARKER_COLOR}",
+        fillOpacity: 0.85
+    }});
+    marker.bindPopup(row[2], {{maxWidth: 260}});
+    return marker;
+}};
+"""
+
+# Lazy variant: rows are [lat, lon, event_id] only. The id rides on an
+# invisible tooltip so st_folium reports it as last_object_clicked_tooltip;
+# the card itself is rendered server-side after the click (see app.py).
+LAZY_CLUSTER_CALLBACK = f"""
+var callback = function (row) {{
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {{
+        radius: {MARKER_RADIUS},
+        color: "{MARKER_COLOR}",
+        fill: true,
+        fillColor: "{MARKER_COLOR}",
+        fillOpacity: 0.85
+    }});
+    marker.bindTooltip(String(row[2]), {{opacity: 0}});
+    return marker;
+}};
+"""
+
+
+# -------------------------------------------------
+# MARKER ROWS (what a map is rebuilt from on every rerun)
+# -------------------------------------------------
+# A folium.Map can't be reused: st_folium rewrites the element tree while
+# rendering it, so a second render of the same object emits broken JS.
+# What is worth keeping between reruns is the per-event data instead.
+def popup_rows(mdf, lang):
+    """[lat, lon, popup_html] per event (cluster and legacy marker modes)."""
+    return [
+        [event["lat_clean"], event["lon_clean"], cached_popup_html(event, lang)]
+        for event in mdf.to_dict("records")
+    ]
+
+
+def id_rows(mdf):
+    """[lat, lon, event_id] per event (lazy popups)."""
+    return mdf[["lat_clean", "lon_clean", "id"]].values.tolist()
+
+
+def rows_bounds(rows):
+    """[[south, west], [north, east]] around the rows, or None when there are none."""
+    if not rows:
+        return None
+    lats = [r[0] for r in rows]
+    lons = [r[1] for r in rows]
+    return [[min(lats), min(lons)], [max(lats), max(lons)]]
+
+
+# -------------------------------------------------
+# LAYERS
+# -------------------------------------------------
+def add_marker_layer(m, rows):
+    """Legacy mode: one CircleMarker + IFrame popup per popup_rows() row (small data sets)."""
+    for lat, lon, html in rows:
+        popup = folium.Popup(folium.IFrame(html, width=260, height=350), max_width=260)
+
+        # Violet marker with slightly larger radius for mobile usability
+        folium.CircleMarker(
+            location=[lat, lon],
+            radius=MARKER_RADIUS,
+            color=MARKER_COLOR,
+            fill=True,
+            fill_color=MARKER_COLOR,
+            fill_opacity=0.85,
+            popup=popup,
+        ).add_to(m)
+
+
+def add_cluster_layer(m, rows):
+    """Single client-side clustered layer: all popup_rows() ship as one JSON array."""
+    FastMarkerCluster(
+        rows,
+        callback=CLUSTER_CALLBACK,
+        chunkedLoading=True,
+        spiderfyOnMaxZoom=True,
+    ).add_to(m)
+
+
+def add_lazy_cluster_layer(m, rows):
+    """Clustered layer carrying only coordinates + event id per marker (id_rows())."""
+    FastMarkerCluster(
+        rows,
+        callback=LAZY_CLUSTER_CALLBACK,
+        chunkedLoading=True,
+        spiderfyOnMaxZoom=True,
+    ).add_to(m)
+
+
+class RemoteGeoJson(MacroElement):
+    """Fetches GeoJSON files in the browser and adds their points to the parent cluster.
+
+    Unlike folium.GeoJson(url, embed=False), nothing is downloaded by Python:
+    the page only carries the URLs (see static_export.py for the files).
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function () {
+            var cluster = {{ this._parent.get_name() }};
+            {{ this.urls_json }}.forEach(function (url) {
+                fetch(url)
+                    .then(function (r) { return r.json(); })
+                    .then(function (data) {
+                        cluster.addLayers(L.geoJSON(data, {
+                            pointToLayer: function (feature, latlng) {
+                                return L.circleMarker(latlng, {
+                                    radius: {{ this.radius }},
+                                    color: "{{ this.color }}",
+                                    fill: true,
+                                    fillColor: "{{ this.color }}",
+                                    fillOpacity: 0.85
+                                });
+                            },
+                            onEachFeature: function (feature, layer) {
+                                layer.bindPopup(feature.properties.popup, {maxWidth: 260});
+                            }
+                        }).getLayers());
+                    });
+            });
+        })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, urls):
+        super().__init__()
+        self._name = "RemoteGeoJson"
+        self.urls_json = json.dumps(list(urls))
+        self.radius = MARKER_RADIUS
+        self.color = MARKER_COLOR
+
+
+def add_static_layer(m, urls):
+    """Clustered layer whose events come from static GeoJSON files on a CDN."""
+    cluster = MarkerCluster(options={"chunkedLoading": True, "spiderfyOnMaxZoom": True})
+    cluster.add_to(m)
+    RemoteGeoJson(urls).add_to(cluster)
+
+
+def clicked_event_id(map_state):
+    """Event id of the marker clicked in a lazy layer, from st_folium's return value."""
+    if not map_state:
+        return None
+    return map_state.get("last_object_clicked_tooltip")
+
+
+def add_locate_control(m):
+    """Browser geolocation button: centres the map on where the user is."""
+    LocateControl(keepCurrentZoomLevel=False, flyTo=True).add_to(m)
+
+
+def fit_to_events(m, bounds):
+    """Fit the map to the events' bounding box (rows_bounds(), two corners, not every point)."""
+    m.fit_bounds(bounds, padding=(20, 20))
+
+
+def add_user_location(m, point, radius_km, fit=True):
+    """Blue dot for the "near me" point plus the search radius (optionally fit to it)."""
+    lat, lon = point
+    folium.Circle(
+        location=[lat, lon],
+        radius=radius_km * 1000,
+        color=USER_COLOR,
+        weight=1,
+        fill=True,
+        fill_opacity=0.06,
+    ).add_to(m)
+    folium.CircleMarker(
+        location=[lat, lon],
+        radius=7,
+        color="#ffffff",
+        weight=2,
+        fill=True,
+        fill_color=USER_COLOR,
+        fill_opacity=1,
+    ).add_to(m)
+
+    if fit:
+        south, west, north, east = radius_box(lat, lon, radius_km)
+        m.fit_bounds([[south, west], [north, east]])
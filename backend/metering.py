@@ -0,0 +1,266 @@
+import contextvars
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+# -------------------------------------------------
+# FIRESTORE READ/WRITE METERING (+ per-session read budget)
+# -------------------------------------------------
+# MeteredFirestore wraps the client handed to the rest of the app and counts
+# billed operations: one read per document returned (at least one per
+# query), one write per set/update/delete. Counts are attributed to the
+# session whose rerun made the call; work on background threads (snapshot
+# listener, submission worker, archiver) is counted as "background", and
+# loads of process-wide caches (inside meter.shared()) as "shared" — they
+# serve everyone, so they don't count against the session that happened
+# to trigger them.
+BACKGROUND = "background"
+SHARED = "shared"
+
+# Sessions remembered for per-session totals (oldest dropped first)
+MAX_SESSIONS = 10_000
+
+METRIC_PREFIX = "maistiaiset_firestore"
+
+
+@dataclass
+class Usage:
+    reads: int = 0
+    writes: int = 0
+
+
+_current = contextvars.ContextVar("firestore_usage_scope", default=None)
+
+
+class FirestoreMeter:
+    """Thread-safe counters: totals, per session, per rerun and per minute."""
+
+    def __init__(self, window_minutes=60):
+        self.window_minutes = window_minutes
+        self.started = time.time()
+        self.total = Usage()
+
+        self._sessions = OrderedDict()                  # session id -> Usage
+        self._minutes = deque(maxlen=window_minutes)    # (minute, Usage)
+        self._lock = threading.Lock()
+
+    # ---------- attribution ----------
+    def start_rerun(self, session_id):
+        """Attribute calls on this thread to session_id; returns this rerun's Usage."""
+        usage = Usage()
+        _current.set((session_id, usage))
+        return usage
+
+    @contextmanager
+    def shared(self):
+        """Charge the block's calls to SHARED (still counted in the rerun's Usage)."""
+        scope = _current.get()
+        token = _current.set((SHARED, scope[1] if scope else None))
+        try:
+            yield
+        finally:
+            _current.reset(token)
+
+    def add(self, reads=0, writes=0):
+        session_id, rerun = _current.get() or (BACKGROUND, None)
+        minute = int(time.time() // 60)
+
+        with self._lock:
+            self.total.reads += reads
+            self.total.writes += writes
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Usage()
+                while len(self._sessions) > MAX_SESSIONS:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.reads += reads
+            session.writes += writes
+
+            if not self._minutes or self._minutes[-1][0] != minute:
+                self._minutes.append((minute, Usage()))
+            self._minutes[-1][1].reads += reads
+            self._minutes[-1][1].writes += writes
+
+            if rerun is not None:
+                rerun.reads += reads
+                rerun.writes += writes
+
+    # ---------- queries ----------
+    def session(self, session_id):
+        with self._lock:
+            usage = self._sessions.get(session_id)
+            return Usage(usage.reads, usage.writes) if usage else Usage()
+
+    def over_budget(self, session_id, read_budget):
+        """True once a session has used its read budget (0 / None = unlimited)."""
+        return bool(read_budget) and self.session(session_id).reads >= read_budget
+
+    def window(self, minutes=None):
+        """Usage over the last `minutes` minutes (default: the whole window)."""
+        since = int(time.time() // 60) - (minutes or self.window_minutes) + 1
+        out = Usage()
+        with self._lock:
+            for minute, usage in self._minutes:
+                if minute >= since:
+                    out.reads += usage.reads
+                    out.writes += usage.writes
+        return out
+
+    def summary(self, top=10):
+        with self._lock:
+            sessions = sorted(self._sessions.items(), key=lambda kv: kv[1].reads, reverse=True)[:top]
+            per_minute = [(m * 60, asdict(u)) for m, u in self._minutes]
+            total = asdict(self.total)
+            n_sessions = len(self._sessions)
+        return {
+            "started": self.started,
+            "total": total,
+            "last_5_min": asdict(self.window(5)),
+            f"last_{self.window_minutes}_min": asdict(self.window()),
+            "per_minute": per_minute,
+            "sessions": n_sessions,
+            "top_sessions": [{"session": s, **asdict(u)} for s, u in sessions],
+        }
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self):
+        s = self.summary()
+        lines = []
+        for op in ("reads", "writes"):
+            name = f"{METRIC_PREFIX}_{op}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {s['total'][op]}"]
+            name = f"{METRIC_PREFIX}_{op}_last_5_min"
+            lines += [f"# TYPE {name} gauge", f"{name} {s['last_5_min'][op]}"]
+        lines += [f"# TYPE {METRIC_PREFIX}_sessions gauge", f"{METRIC_PREFIX}_sessions {s['sessions']}"]
+        return "\n".join(lines) + "\n"
+
+
+# -------------------------------------------------
+# CLIENT WRAPPERS
+# -------------------------------------------------
+def _unwrap(obj):
+    return getattr(obj, "_target", obj)
+
+
+class _Proxy:
+    def __init__(self, target, meter):
+        self._target = target
+        self._meter = meter
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class MeteredQuery(_Proxy):
+    def _wrap(self, query):
+        return MeteredQuery(query, self._meter)
+
+    def where(self, *args, **kwargs):
+        return self._wrap(self._target.where(*args, **kwargs))
+
+    def order_by(self, *args, **kwargs):
+        return self._wrap(self._target.order_by(*args, **kwargs))
+
+    def limit(self, n):
+        return self._wrap(self._target.limit(n))
+
+    def start_after(self, cursor):
+        return self._wrap(self._target.start_after(cursor))
+
+    def stream(self, *args, **kwargs):
+        n = 0
+        try:
+            for snap in self._target.stream(*args, **kwargs):
+                n += 1
+                yield snap
+        finally:
+            # An empty result is still billed as one read
+            self._meter.add(reads=max(n, 1))
+
+    def get(self, *args, **kwargs):
+        return list(self.stream(*args, **kwargs))
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name != "on_snapshot":
+            return attr
+
+        # Looked up lazily so hasattr(query, "on_snapshot") keeps telling
+        # whether the backend has listeners (FakeFirestore doesn't)
+        def on_snapshot(callback):
+            def counted(docs, changes, read_time):
+                self._meter.add(reads=len(changes))
+                return callback(docs, changes, read_time)
+
+            return attr(counted)
+
+        return on_snapshot
+
+
+class MeteredDocument(_Proxy):
+    def get(self, *args, **kwargs):
+        self._meter.add(reads=1)
+        return self._target.get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self._meter.add(writes=1)
+        return self._target.set(*args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        self._meter.add(writes=1)
+        return self._target.update(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        self._meter.add(writes=1)
+        return self._target.delete(*args, **kwargs)
+
+
+class MeteredCollection(MeteredQuery):
+    def document(self, *args, **kwargs):
+        return MeteredDocument(self._target.document(*args, **kwargs), self._meter)
+
+    def add(self, data, *args, **kwargs):
+        self._meter.add(writes=1)
+        return self._target.add(data, *args, **kwargs)
+
+
+class MeteredBatch(_Proxy):
+    def __init__(self, target, meter):
+        super().__init__(target, meter)
+        self._ops = 0
+
+    def set(self, ref, *args, **kwargs):
+        self._ops += 1
+        return self._target.set(_unwrap(ref), *args, **kwargs)
+
+    def update(self, ref, *args, **kwargs):
+        self._ops += 1
+        return self._target.update(_unwrap(ref), *args, **kwargs)
+
+    def delete(self, ref, *args, **kwargs):
+        self._ops += 1
+        return self._target.delete(_unwrap(ref), *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        result = self._target.commit(*args, **kwargs)
+        self._meter.add(writes=self._ops)
+        self._ops = 0
+        return result
+
+
+class MeteredFirestore(_Proxy):
+    """Firestore client (or FakeFirestore) whose billed operations are counted."""
+
+    def collection(self, *args, **kwargs):
+        return MeteredCollection(self._target.collection(*args, **kwargs), self._meter)
+
+    def batch(self):
+        return MeteredBatch(self._target.batch(), self._meter)
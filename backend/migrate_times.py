@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from event_store import EVENTS_COLLECTION
+from firebase_client import init_firebase, load_secrets
+from normalize import LEGACY_FORMAT
+
+# -------------------------------------------------
+# ONE-OFF: convert legacy string times to Firestore timestamps
+# -------------------------------------------------
+# Older form submissions stored start_time/end_time as "%Y-%m-%d %H:%M"
+# strings. Server-side range queries on end_time only match real
+# timestamps, so those documents must be converted once. The string
+# format is normalize.LEGACY_FORMAT.
+
+
+def parse_legacy(value):
+    """Return a datetime for a legacy string value, or None if not a string."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.strptime(value, LEGACY_FORMAT)
+    except ValueError:
+        return None
+
+
+def main():
+    db = init_firebase(load_secrets()["firebase"])
+
+    converted = 0
+    for e in db.collection(EVENTS_COLLECTION).stream():
+        doc = e.to_dict()
+        updates = {}
+        for field in ("start_time", "end_time"):
+            dt = parse_legacy(doc.get(field))
+            if dt is not None:
+                updates[field] = dt
+        if updates:
+            e.reference.update(updates)
+            converted += 1
+
+    print(f"Converted {converted} event(s) to timestamp times.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+# -------------------------------------------------
+# EVENT NORMALIZATION (VECTORIZED, ONCE PER DATA VERSION)
+# -------------------------------------------------
+# Format written by the old form before times became Firestore timestamps
+LEGACY_FORMAT = "%Y-%m-%d %H:%M"
+
+# Event times are Finnish wall-clock times, so "now" has to be too,
+# whatever timezone the host runs in (usually UTC)
+APP_TIMEZONE = "Europe/Helsinki"
+
+# Display format used by the list cards, map popups and admin panel
+DISPLAY_FORMAT = "%d-%m-%Y %H:%M"
+
+# Fields that end up in the card/popup HTML (see event_html.py)
+DISPLAY_FIELDS = (
+    "product_name", "brand_id", "store_name", "address", "city",
+    "description", "image_url", "image_urls", "start_fmt", "end_fmt",
+)
+
+
+def local_now():
+    """Current time in APP_TIMEZONE as a naive datetime, comparable with event times."""
+    return datetime.now(ZoneInfo(APP_TIMEZONE)).replace(tzinfo=None)
+
+
+def to_datetime64(col: pd.Series) -> pd.Series:
+    """Firestore Timestamps / datetimes / legacy strings → naive datetime64.
+
+    Timestamps are kept as wall-clock time (the app stores naive local
+    times, which Firestore hands back tagged as UTC), so the tz is dropped
+    rather than converted.
+    """
+    is_str = col.map(lambda v: isinstance(v, str))
+
+    # Real timestamps (aware or naive) in one pass
+    out = pd.to_datetime(col.where(~is_str), utc=True, errors="coerce").dt.tz_localize(None)
+
+    if is_str.any():
+        strings = col.where(is_str)
+        parsed = pd.to_datetime(strings, format=LEGACY_FORMAT, errors="coerce")
+
+        # Anything not in the legacy format gets one slower, flexible pass
+        leftover = parsed.isna() & is_str & (strings != "")
+        if leftover.any():
+            parsed[leftover] = pd.to_datetime(strings[leftover], format="mixed", errors="coerce")
+
+        out = out.where(~is_str, parsed)
+
+    return out.astype("datetime64[ns]")
+
+
+def normalize_events(df: pd.DataFrame) -> pd.DataFrame:
+    """Add parsed/derived columns used by the filters, list, map and admin views.
+
+    start_dt / end_dt            datetime64 (NaT when missing or unparseable)
+    start_fmt / end_fmt          DD-MM-YYYY HH:MM strings ("" when missing)
+    start_date_clean / end_...   datetime64 at midnight, for date filters
+    lat_clean / lon_clean        float coordinates (NaN when invalid)
+    content_hash                 hash of the displayed fields (HTML cache key)
+    """
+    if df is None or df.empty:
+        return df
+
+    df = df.copy()
+    n = len(df)
+
+    for prefix in ("start", "end"):
+        raw = df[f"{prefix}_time"] if f"{prefix}_time" in df else pd.Series([None] * n, index=df.index)
+        dt = to_datetime64(raw)
+
+        df[f"{prefix}_dt"] = dt
+        df[f"{prefix}_fmt"] = dt.dt.strftime(DISPLAY_FORMAT).fillna("")
+        df[f"{prefix}_date_clean"] = dt.dt.normalize()
+
+    for src, dst in (("latitude", "lat_clean"), ("longitude", "lon_clean")):
+        raw = df[src] if src in df else pd.Series([None] * n, index=df.index)
+        df[dst] = pd.to_numeric(raw, errors="coerce")
+
+    shown = df.reindex(columns=list(DISPLAY_FIELDS)).astype(str)
+    df["content_hash"] = pd.util.hash_pandas_object(shown, index=False).to_numpy()
+
+    return df
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# -------------------------------------------------
+# PER-STAGE TIMINGS (rolling percentiles, JSON / Prometheus dump)
+# -------------------------------------------------
+# Samples kept per stage for the percentiles (older ones roll off)
+WINDOW = 500
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_PREFIX = "maistiaiset"
+
+
+class _Stage:
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)   # seconds
+        self.count = 0
+        self.total = 0.0
+        self.sizes = {}                       # payload name -> last value
+
+
+class PerfRecorder:
+    """Timing spans + payload sizes per pipeline stage, shared by all sessions.
+
+    Usage:
+        with perf.span("normalize") as sizes:
+            df = normalize_events(raw)
+            sizes["rows"] = len(df)
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.started = time.time()
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, **sizes):
+        with self._lock:
+            s = self._stages.get(stage)
+            if s is None:
+                s = self._stages[stage] = _Stage(self.window)
+            s.samples.append(seconds)
+            s.count += 1
+            s.total += seconds
+            s.sizes.update(sizes)
+
+    @contextmanager
+    def span(self, stage, **sizes):
+        """Time the block; sizes can be passed up front or filled in the yielded dict."""
+        start = time.perf_counter()
+        try:
+            yield sizes
+        finally:
+            self.record(stage, time.perf_counter() - start, **sizes)
+
+    # ---------- export ----------
+    def summary(self):
+        """{stage: {count, p50_ms, p95_ms, p99_ms, last_ms, sizes}} over the rolling window."""
+        with self._lock:
+            stages = {name: (list(s.samples), s.count, s.total, dict(s.sizes))
+                      for name, s in self._stages.items()}
+
+        out = {}
+        for name, (samples, count, total, sizes) in sorted(stages.items()):
+            ms = np.asarray(samples) * 1000
+            p = np.quantile(ms, QUANTILES) if len(ms) else [0.0] * len(QUANTILES)
+            out[name] = {
+                "count": count,
+                "total_s": round(total, 3),
+                **{f"p{int(q * 100)}_ms": round(float(v), 2) for q, v in zip(QUANTILES, p)},
+                "last_ms": round(float(ms[-1]), 2) if len(ms) else 0.0,
+                "sizes": sizes,
+            }
+        return out
+
+    def to_json(self, extra=None):
+        data = {"started": self.started, "window": self.window, "stages": self.summary()}
+        if extra:
+            data.update(extra)
+        return json.dumps(data, indent=2, default=str)
+
+    def to_prometheus(self, gauges=None):
+        """Prometheus text format: one summary per stage plus payload-size gauges."""
+        summary = self.summary()
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Wall time per pipeline stage.", f"# TYPE {name} summary"]
+        for stage, s in summary.items():
+            for q in QUANTILES:
+                value = s[f"p{int(q * 100)}_ms"] / 1000
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {s["total_s"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {s["count"]}')
+
+        size_name = f"{METRIC_PREFIX}_stage_payload"
+        lines += [f"# HELP {size_name} Last payload size seen per stage.", f"# TYPE {size_name} gauge"]
+        for stage, s in summary.items():
+            for key, value in s["sizes"].items():
+                lines.append(f'{size_name}{{stage="{stage}",size="{key}"}} {value}')
+
+        for key, value in (gauges or {}).items():
+            lines += [f"# TYPE {METRIC_PREFIX}_{key} gauge", f"{METRIC_PREFIX}_{key} {value}"]
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self.started = time.time()
@@ -0,0 +1,253 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from event_store import EVENTS_COLLECTION, QUERY_PAGE_SIZE, stream_paged
+from normalize import LEGACY_FORMAT
+
+log = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# LOCAL READ REPLICA (SQLite mirror of the events collection)
+# -------------------------------------------------
+# Public views read from here; Firestore is only used for writes and for
+# keeping the mirror in sync (one full read, then a snapshot listener that
+# delivers just the changed documents).
+DEFAULT_REPLICA_PATH = os.path.join(os.path.dirname(__file__), ".cache", "events.sqlite")
+
+_EPOCH = datetime(1970, 1, 1)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    " id TEXT PRIMARY KEY,"
+    " approved INTEGER NOT NULL,"
+    " start_ts REAL,"       # wall-clock seconds (tz dropped, as normalize.py does)
+    " end_ts REAL,"
+    " lat REAL,"
+    " lon REAL,"
+    " doc TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS events_approved_end ON events (approved, end_ts)",
+    "CREATE INDEX IF NOT EXISTS events_approved_start ON events (approved, start_ts)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL)",
+)
+
+
+def wall_seconds(value):
+    """Event time (datetime or legacy string) → seconds since epoch, or None."""
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, LEGACY_FORMAT)
+        except ValueError:
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+    if not isinstance(value, datetime):
+        return None
+    return (value.replace(tzinfo=None) - _EPOCH).total_seconds()
+
+
+def _coord(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value == value else None     # NaN → None
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__dt__": value.isoformat()}
+    raise TypeError(f"Cannot store {type(value).__name__} in the replica")
+
+
+def _encode_as_text(value):
+    """Fallback for field types the app never writes (GeoPoint, bytes, refs, ...)."""
+    try:
+        return _encode(value)
+    except TypeError:
+        return str(value)
+
+
+def _dumps(doc_id, doc):
+    # Runs on the snapshot listener's thread too, where an exception would
+    # stop the listener: one odd document must not break the whole mirror
+    try:
+        return json.dumps(doc, default=_encode, ensure_ascii=False)
+    except TypeError as e:
+        log.warning("Replica: storing odd fields of doc %s as text (%s)", doc_id, e)
+        return json.dumps(doc, default=_encode_as_text, ensure_ascii=False)
+
+
+def _decode(obj):
+    if "__dt__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__dt__"])
+    return obj
+
+
+class EventReplica:
+    """SQLite copy of the events collection, queryable without Firestore reads."""
+
+    def __init__(self, path=DEFAULT_REPLICA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._watch = None
+        self._watch_ready = threading.Event()
+        self._watch_fresh = False       # next callback is the listener's first
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    # ---------- writes ----------
+    @staticmethod
+    def _row(doc_id, doc):
+        doc = {k: v for k, v in doc.items() if k != "id"}
+        return (
+            doc_id,
+            1 if doc.get("approved") is True else 0,
+            wall_seconds(doc.get("start_time")),
+            wall_seconds(doc.get("end_time")),
+            _coord(doc.get("latitude")),
+            _coord(doc.get("longitude")),
+            _dumps(doc_id, doc),
+        )
+
+    def upsert_many(self, docs):
+        """Insert/replace (doc_id, doc) pairs in one transaction."""
+        rows = [self._row(doc_id, doc) for doc_id, doc in docs]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def upsert(self, doc_id, doc):
+        self.upsert_many([(doc_id, doc)])
+
+    def update(self, doc_id, fields):
+        """Merge fields into a mirrored doc (write-through after an app write)."""
+        doc = self.get(doc_id)
+        if doc is not None:
+            doc.update(fields)
+            self.upsert(doc_id, doc)
+
+    def remove_many(self, doc_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM events WHERE id = ?", [(i,) for i in doc_ids])
+
+    def remove(self, doc_id):
+        self.remove_many([doc_id])
+
+    # ---------- sync ----------
+    def _set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def synced_at(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'synced_at'").fetchone()
+        return row[0] if row else None
+
+    def sync_full(self, db, collection=EVENTS_COLLECTION, page_size=QUERY_PAGE_SIZE):
+        """Mirror the whole collection (pages by doc id) and drop docs gone upstream."""
+        seen = set()
+        batch = []
+        for snap in stream_paged(db.collection(collection), "__name__", page_size):
+            seen.add(snap.id)
+            batch.append((snap.id, snap.to_dict()))
+            if len(batch) >= page_size:
+                self.upsert_many(batch)
+                batch = []
+        self.upsert_many(batch)
+        self._prune(seen)
+        self._set_meta("synced_at", time.time())
+        return len(seen)
+
+    def _prune(self, keep):
+        """Drop mirrored docs whose id is not in `keep` (deleted upstream)."""
+        with self._lock:
+            stale = [r[0] for r in self._conn.execute("SELECT id FROM events") if r[0] not in keep]
+        self.remove_many(stale)
+
+    def _on_snapshot(self, docs, changes, _read_time):
+        upserts = [(c.document.id, c.document.to_dict()) for c in changes if c.type.name != "REMOVED"]
+        removed = [c.document.id for c in changes if c.type.name == "REMOVED"]
+        self.upsert_many(upserts)
+        self.remove_many(removed)
+        if self._watch_fresh:
+            # The first callback lists every doc that exists now; rows for
+            # docs deleted while nobody was listening (app down, cron
+            # archive, console) only go away here
+            self._prune({d.id for d in docs})
+            self._watch_fresh = False
+        self._set_meta("synced_at", time.time())
+        self._watch_ready.set()
+
+    def watch(self, db, collection=EVENTS_COLLECTION, wait=30):
+        """Keep in sync via a Firestore snapshot listener; False if the backend has none.
+
+        The listener's first callback carries every document, so this
+        replaces the initial sync_full() (rows of docs that no longer exist
+        are pruned then). Waits up to `wait` seconds for it.
+        """
+        col = db.collection(collection)
+        if not hasattr(col, "on_snapshot"):
+            return False
+        if self._watch is None:
+            self._watch_ready.clear()
+            self._watch_fresh = True
+            self._watch = col.on_snapshot(self._on_snapshot)
+            self._watch_ready.wait(wait)
+        return True
+
+    def _watch_alive(self):
+        return self._watch is not None and getattr(self._watch, "is_active", True)
+
+    def ensure_synced(self, db, max_age, collection=EVENTS_COLLECTION):
+        """Full re-sync when no listener is running and the mirror is older than max_age.
+
+        A listener that has died (stream closed on an error) is replaced:
+        full sync now, then a new listener.
+        """
+        if self._watch_alive():
+            return
+        if self._watch is not None:
+            self._watch = None
+            self.sync_full(db, collection)
+            self.watch(db, collection, wait=0)
+            return
+        synced_at = self.synced_at()
+        if synced_at is None or time.time() - synced_at > max_age:
+            self.sync_full(db, collection)
+
+    # ---------- reads ----------
+    def _docs(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        docs = []
+        for doc_id, raw in rows:
+            doc = json.loads(raw, object_hook=_decode)
+            doc["id"] = doc_id
+            docs.append(doc)
+        return docs
+
+    def get(self, doc_id):
+        docs = self._docs("SELECT id, doc FROM events WHERE id = ?", (doc_id,))
+        return docs[0] if docs else None
+
+    def public_events(self, since):
+        """Approved events ending on/after `since` (legacy string times included)."""
+        return self._docs(
+            "SELECT id, doc FROM events WHERE approved = 1 AND end_ts >= ? ORDER BY end_ts",
+            (wall_seconds(since),),
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
@@ -0,0 +1,123 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+# -------------------------------------------------
+# FULL-TEXT SEARCH (in-memory inverted index, prefix matching)
+# -------------------------------------------------
+SEARCH_FIELDS = ("product_name", "brand_id", "store_name", "description")
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text) -> str:
+    """Lower-case and strip diacritics, so "Kähvi", "KAHVI" and "kahvi" all match."""
+    if not isinstance(text, str):
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return _WORD.findall(fold(text))
+
+
+class SearchIndex:
+    """Token → doc ids, kept in sync with the event snapshot incrementally.
+
+    sync() only re-indexes documents whose content_hash changed (and drops
+    deleted ones), so a write-through update costs one document, not a
+    rebuild. Queries match every word as a prefix and AND the words.
+    """
+
+    def __init__(self, fields=SEARCH_FIELDS):
+        self.fields = fields
+        self.version = None
+
+        self._postings = {}      # token -> set of doc ids
+        self._doc_tokens = {}    # doc id -> (content_hash, set of tokens)
+        self._vocab = []         # sorted tokens, for prefix ranges
+        self._vocab_dirty = False
+        self._lock = threading.RLock()
+
+    # ---------- maintenance ----------
+    def _remove(self, doc_id):
+        _, tokens = self._doc_tokens.pop(doc_id)
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._postings[token]
+                    self._vocab_dirty = True
+
+    def _add(self, doc_id, content_hash, texts):
+        tokens = set()
+        for text in texts:
+            tokens.update(tokenize(text))
+
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = {doc_id}
+                self._vocab_dirty = True
+            else:
+                ids.add(doc_id)
+        self._doc_tokens[doc_id] = (content_hash, tokens)
+
+    def sync(self, version, df):
+        """Bring the index up to date with a normalize_events frame (no-op if same version)."""
+        with self._lock:
+            if version == self.version:
+                return
+            if df is None or df.empty:
+                for doc_id in list(self._doc_tokens):
+                    self._remove(doc_id)
+                self.version = version
+                return
+
+            columns = [df[f] if f in df else [None] * len(df) for f in self.fields]
+            seen = set()
+            for doc_id, content_hash, *texts in zip(df["id"], df["content_hash"], *columns):
+                seen.add(doc_id)
+                current = self._doc_tokens.get(doc_id)
+                if current is not None and current[0] == content_hash:
+                    continue
+                if current is not None:
+                    self._remove(doc_id)
+                self._add(doc_id, content_hash, texts)
+
+            for doc_id in [d for d in self._doc_tokens if d not in seen]:
+                self._remove(doc_id)
+
+            self.version = version
+
+    # ---------- lookup ----------
+    def _prefix_ids(self, prefix):
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+
+        ids = set()
+        i = bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            ids |= self._postings[self._vocab[i]]
+            i += 1
+        return ids
+
+    def search(self, query):
+        """Doc ids matching every word of `query` (as prefixes), or None for an empty query."""
+        words = tokenize(query)
+        if not words:
+            return None
+
+        with self._lock:
+            result = None
+            # Longest words first: usually the smallest candidate sets
+            for word in sorted(words, key=len, reverse=True):
+                ids = self._prefix_ids(word)
+                result = ids if result is None else result & ids
+                if not result:
+                    return set()
+            return result
@@ -0,0 +1,123 @@
+import numpy as np
+
+# -------------------------------------------------
+# SPATIAL INDEX (GRID BUCKETS OVER LAT/LON)
+# -------------------------------------------------
+# 0.1° is roughly 11 km north–south: a city-sized bucket
+DEFAULT_CELL_DEG = 0.1
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance (km) from one point to arrays of points, vectorized."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def radius_box(lat, lon, radius_km):
+    """(south, west, north, east) box that contains the circle around (lat, lon)."""
+    dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+    # Longitude degrees shrink towards the poles (Lapland matters here)
+    dlon = dlat / max(np.cos(np.radians(lat)), 1e-6)
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+class GridIndex:
+    """Fixed-size lat/lon grid over event coordinates.
+
+    Rows are grouped by cell once at build time; a bounding-box query only
+    looks at the non-empty cells overlapping the box and then checks the
+    exact coordinates of the rows inside them. Query results are row
+    positions into the arrays the index was built from.
+    """
+
+    def __init__(self, lats, lons, cell_deg=DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+
+        valid = np.flatnonzero(~(np.isnan(self.lats) | np.isnan(self.lons)))
+        rows = np.floor(self.lats[valid] / cell_deg).astype(np.int64)
+        cols = np.floor(self.lons[valid] / cell_deg).astype(np.int64)
+
+        # Sort rows by cell so every cell is one contiguous slice of _order
+        order = np.lexsort((cols, rows))
+        rows, cols = rows[order], cols[order]
+        self._order = valid[order]
+
+        if len(order):
+            new_cell = np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])]
+            self._starts = np.flatnonzero(new_cell)
+            self._ends = np.r_[self._starts[1:], len(order)]
+            self._cell_rows = rows[self._starts]
+            self._cell_cols = cols[self._starts]
+        else:
+            self._starts = self._ends = np.empty(0, dtype=np.int64)
+            self._cell_rows = self._cell_cols = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._order)
+
+    @classmethod
+    def from_frame(cls, df, cell_deg=DEFAULT_CELL_DEG):
+        """Build from a normalize_events frame (lat_clean / lon_clean)."""
+        if df is None or df.empty:
+            return cls([], [], cell_deg)
+        return cls(df["lat_clean"].to_numpy(), df["lon_clean"].to_numpy(), cell_deg)
+
+    def query(self, south, west, north, east):
+        """Row positions of points inside the box (inclusive)."""
+        r0, r1 = np.floor(np.array([south, north]) / self.cell_deg).astype(np.int64)
+        c0, c1 = np.floor(np.array([west, east]) / self.cell_deg).astype(np.int64)
+
+        hit = (
+            (self._cell_rows >= r0) & (self._cell_rows <= r1)
+            & (self._cell_cols >= c0) & (self._cell_cols <= c1)
+        )
+        cells = np.flatnonzero(hit)
+        if not len(cells):
+            return np.empty(0, dtype=np.int64)
+
+        # Gather the contiguous slices of all hit cells in one vectorized step
+        lens = self._ends[cells] - self._starts[cells]
+        first = np.repeat(self._starts[cells] - (np.cumsum(lens) - lens), lens)
+        candidates = self._order[first + np.arange(lens.sum())]
+        lat = self.lats[candidates]
+        lon = self.lons[candidates]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return candidates[inside]
+
+    def query_radius(self, lat, lon, radius_km):
+        """(positions, distances_km) of points within radius_km, nearest first."""
+        candidates = self.query(*radius_box(lat, lon, radius_km))
+        dist = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+
+        keep = dist <= radius_km
+        candidates, dist = candidates[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return candidates[order], dist[order]
+
+
+# -------------------------------------------------
+# VIEWPORT HELPERS (st_folium bounds)
+# -------------------------------------------------
+def viewport_box(bounds, margin=0.25):
+    """st_folium bounds dict → (south, west, north, east) grown by `margin` of its size."""
+    try:
+        sw, ne = bounds["_southWest"], bounds["_northEast"]
+        south, west, north, east = sw["lat"], sw["lng"], ne["lat"], ne["lng"]
+    except (KeyError, TypeError):
+        return None
+    if None in (south, west, north, east):
+        return None
+
+    dlat = (north - south) * margin
+    dlon = (east - west) * margin
+    return south - dlat, west - dlon, north + dlat, east + dlon
@@ -0,0 +1,264 @@
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from event_html import popup_html
+
+# -------------------------------------------------
+# STATIC GEOJSON SNAPSHOT (CDN-served map data)
+# -------------------------------------------------
+# Approved, normalized events are written as GeoJSON files split by region
+# tile and day (gzipped in Storage, plain in a local folder):
+#
+#   static/events/manifest.json                         (short cache)
+#   static/events/2026-10-18/r60n24e.3f9c0a1b2c4d.geojson  (immutable)
+#
+# File names carry a hash of their content, so unchanged files keep their
+# URL (and their edge-cache entry) across publishes; only the manifest
+# changes. The map fetches the files directly in the browser.
+#
+# Usage:
+#   python static_export.py --out ./public            # write to a folder
+#   python static_export.py --bucket                  # upload to Storage
+STATIC_PREFIX = "static/events"
+MANIFEST_NAME = "manifest.json"
+
+# Region tiles: 1° of latitude x 2° of longitude (~110 x 110 km in Finland)
+REGION_LAT_DEG = 1.0
+REGION_LON_DEG = 2.0
+
+# Long-running events are listed under at most this many days
+MAX_DAYS_PER_EVENT = 14
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+MANIFEST_CACHE = "public, max-age=60"
+
+FEATURE_FIELDS = ("product_name", "brand_id", "store_name", "city", "start_fmt", "end_fmt")
+
+
+def region_key(lat, lon):
+    """Name of the region tile containing (lat, lon), e.g. "r60n24e"."""
+    south = math.floor(lat / REGION_LAT_DEG) * REGION_LAT_DEG
+    west = math.floor(lon / REGION_LON_DEG) * REGION_LON_DEG
+    return f"r{south:g}n{west:g}e"
+
+
+def region_bbox(lat, lon):
+    """[south, west, north, east] of the tile containing (lat, lon)."""
+    south = math.floor(lat / REGION_LAT_DEG) * REGION_LAT_DEG
+    west = math.floor(lon / REGION_LON_DEG) * REGION_LON_DEG
+    return [south, west, south + REGION_LAT_DEG, west + REGION_LON_DEG]
+
+
+def event_feature(event):
+    """GeoJSON Point feature with the id, display fields and ready-made popup HTML.
+
+    The map binds "popup" as HTML, and popup_html() escapes every submitted
+    field for that. The other properties are raw text, so never insert
+    them into a page as HTML.
+    """
+    props = {"id": event["id"], **{f: event.get(f) or "" for f in FEATURE_FIELDS}}
+    props["popup"] = popup_html(event)
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(event["lon_clean"], 6), round(event["lat_clean"], 6)]},
+        "properties": props,
+    }
+
+
+def build_files(df):
+    """{(day, region): [features]} from a normalize_events frame.
+
+    Events without coordinates or times are left out; multi-day events go
+    into every day they run (capped at MAX_DAYS_PER_EVENT).
+    """
+    files = {}
+    if df is None or df.empty:
+        return files
+
+    usable = df.dropna(subset=["lat_clean", "lon_clean", "start_date_clean", "end_date_clean"])
+    for event in usable.to_dict("records"):
+        feature = event_feature(event)
+        region = region_key(event["lat_clean"], event["lon_clean"])
+        last = min(event["end_date_clean"], event["start_date_clean"] + pd.Timedelta(days=MAX_DAYS_PER_EVENT - 1))
+        for day in pd.date_range(event["start_date_clean"], last, freq="D"):
+            files.setdefault((day.strftime("%Y-%m-%d"), region), []).append(feature)
+    return files
+
+
+def encode_file(features):
+    """(gzipped bytes, short content hash) — deterministic for the same features."""
+    features = sorted(features, key=lambda f: f["properties"]["id"])
+    raw = json.dumps(
+        {"type": "FeatureCollection", "features": features},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode()
+    return gzip.compress(raw, mtime=0), hashlib.sha256(raw).hexdigest()[:12]
+
+
+# -------------------------------------------------
+# SINKS (local folder or Storage bucket)
+# -------------------------------------------------
+class FolderSink:
+    """Plain files for any static server.
+
+    A plain server sends no Content-Encoding header for them, so gzipped
+    data is stored decompressed: .geojson files always hold GeoJSON.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def exists(self, path):
+        return os.path.exists(os.path.join(self.root, path))
+
+    def write(self, path, data, content_type, gzipped=False, immutable=False):
+        full = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "wb") as f:
+            f.write(gzip.decompress(data) if gzipped else data)
+
+
+class BucketSink:
+    """Cloud Storage; gzipped files are served with Content-Encoding: gzip."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def exists(self, path):
+        return self.bucket.blob(path).exists()
+
+    def write(self, path, data, content_type, gzipped=False, immutable=False):
+        blob = self.bucket.blob(path)
+        blob.cache_control = IMMUTABLE_CACHE if immutable else MANIFEST_CACHE
+        if gzipped:
+            blob.content_encoding = "gzip"
+        blob.upload_from_string(data, content_type=content_type)
+
+
+def publish(df, sink, prefix=STATIC_PREFIX):
+    """Write changed day/region files and a fresh manifest; returns the manifest."""
+    entries = []
+    written = 0
+    for (day, region), features in sorted(build_files(df).items()):
+        data, digest = encode_file(features)
+        path = f"{prefix}/{day}/{region}.{digest}.geojson"
+        # Same content → same name: already uploaded, nothing to do
+        if not sink.exists(path):
+            sink.write(path, data, "application/geo+json", gzipped=True, immutable=True)
+            written += 1
+
+        lon, lat = features[0]["geometry"]["coordinates"]
+        entries.append({
+            "day": day,
+            "region": region,
+            "path": path[len(prefix) + 1:],
+            "bbox": region_bbox(lat, lon),
+            "count": len(features),
+        })
+
+    manifest = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "version": hashlib.sha256("".join(e["path"] for e in entries).encode()).hexdigest()[:12],
+        "files": entries,
+        "written": written,
+    }
+    sink.write(
+        f"{prefix}/{MANIFEST_NAME}",
+        json.dumps(manifest, separators=(",", ":")).encode(),
+        "application/json",
+    )
+    return manifest
+
+
+def select_files(manifest, days, box=None):
+    """Manifest entries for the given day strings, optionally only tiles touching box."""
+    days = set(days)
+    selected = []
+    for entry in (manifest or {}).get("files", []):
+        if entry["day"] not in days:
+            continue
+        if box:
+            south, west, north, east = box
+            s, w, n, e = entry["bbox"]
+            if s > north or n < south or w > east or e < west:
+                continue
+        selected.append(entry)
+    return selected
+
+
+# -------------------------------------------------
+# BACKGROUND PUBLISHER (coalesces bursts of approvals)
+# -------------------------------------------------
+class StaticPublisher:
+    """Runs publish() on a background thread; a burst of requests becomes one run."""
+
+    def __init__(self, sink, prefix=STATIC_PREFIX):
+        self.sink = sink
+        self.prefix = prefix
+        self.last_manifest = None
+        self.last_error = None
+
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="static-publish")
+        self._lock = threading.Lock()
+        self._pending = False
+
+    def request(self, load_frame):
+        """Schedule a publish of load_frame() (called on the worker thread)."""
+        with self._lock:
+            if self._pending:
+                return
+            self._pending = True
+        self._pool.submit(self._run, load_frame)
+
+    def _run(self, load_frame):
+        with self._lock:
+            self._pending = False
+        try:
+            self.last_manifest = publish(load_frame(), self.sink, self.prefix)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+
+
+def main(argv=None):
+    from event_store import fetch_public_events, public_window_start
+    from firebase_client import init_db, load_secrets
+    from normalize import normalize_events
+
+    parser = argparse.ArgumentParser(description="Publish approved events as static GeoJSON files.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="local folder to write into")
+    target.add_argument("--bucket", action="store_true", help="upload to the Firebase Storage bucket")
+    parser.add_argument("--lookback-days", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    secrets = load_secrets()
+    db = init_db(secrets)
+    docs = fetch_public_events(db, public_window_start(args.lookback_days))
+    df = normalize_events(pd.DataFrame(docs))
+
+    if args.bucket:
+        from firebase_admin import storage
+
+        sink = BucketSink(storage.bucket())
+    else:
+        sink = FolderSink(args.out)
+
+    manifest = publish(df, sink)
+    print(f"{len(docs)} events → {len(manifest['files'])} files ({manifest['written']} new), "
+          f"manifest {manifest['version']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
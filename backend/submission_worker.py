@@ -0,0 +1,125 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from event_store import EVENTS_COLLECTION
+from images import make_variants, upload_variants
+from submissions import ADDRESS_NOT_FOUND_MSG, SubmissionError, build_event_doc
+
+# -------------------------------------------------
+# BACKGROUND SUBMISSION WORKER
+# -------------------------------------------------
+# The form validates inline, then hands geocode → Firestore write → image
+# upload to this worker so the Streamlit script thread returns at once.
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Finished jobs remembered for status lookups
+MAX_JOBS_KEPT = 1000
+
+
+@dataclass
+class SubmissionJob:
+    id: str
+    status: str = QUEUED
+    message: str = ""
+    doc_id: str | None = None
+    attempts: int = 0
+
+
+def with_retries(fn, retries=3, backoff=1.0):
+    """Call fn(); on exception retry with exponential backoff, then re-raise."""
+    for attempt in range(retries):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries - 1:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+class SubmissionWorker:
+    """Thread pool running submissions; job status is polled by the form."""
+
+    def __init__(self, db, bucket, geocoder, image_pool=None, max_workers=2,
+                 retries=3, backoff=1.0):
+        self.db = db
+        self.bucket = bucket
+        self.geocoder = geocoder
+        self.image_pool = image_pool
+        self.retries = retries
+        self.backoff = backoff
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="submissions")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ---------- public ----------
+    def submit(self, fields, start_dt, end_dt, image_bytes=None):
+        """Queue an already validated submission; returns its job id."""
+        job = SubmissionJob(id=uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_JOBS_KEPT:
+                self._jobs.popitem(last=False)
+
+        self._pool.submit(self._run, job.id, fields, start_dt, end_dt, image_bytes)
+        return job.id
+
+    def status(self, job_id):
+        """Snapshot of a job (None if unknown or long forgotten)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    # ---------- worker side ----------
+    def _update(self, job_id, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                for k, v in changes.items():
+                    setattr(job, k, v)
+
+    def _retry(self, job_id, fn):
+        def attempt():
+            with self._lock:
+                if job_id in self._jobs:
+                    self._jobs[job_id].attempts += 1
+            return fn()
+
+        return with_retries(attempt, self.retries, self.backoff)
+
+    def _run(self, job_id, fields, start_dt, end_dt, image_bytes):
+        self._update(job_id, status=RUNNING)
+        try:
+            # GEOCODING (a clean "not found" is final, errors are retried)
+            coords = self._retry(job_id, lambda: self.geocoder.geocode(fields["address"], fields["city"]))
+            if not coords:
+                raise SubmissionError(ADDRESS_NOT_FOUND_MSG)
+
+            # FIRESTORE WRITE
+            doc = build_event_doc(fields, start_dt, end_dt, coords)
+            doc_ref = self.db.collection(EVENTS_COLLECTION).document()
+            self._retry(job_id, lambda: doc_ref.set(doc))
+            self._update(job_id, doc_id=doc_ref.id)
+
+        except SubmissionError as e:
+            self._update(job_id, status=FAILED, message=str(e))
+            return
+        except Exception as e:
+            self._update(job_id, status=FAILED, message=f"Submission failed: {e}")
+            return
+
+        # IMAGE UPLOAD (the event exists even if this part fails; no bucket offline)
+        if image_bytes and self.bucket is not None:
+            try:
+                variants = make_variants(image_bytes, pool=self.image_pool)
+                urls = self._retry(job_id, lambda: upload_variants(self.bucket, doc_ref.id, variants))
+                self._retry(job_id, lambda: doc_ref.update({"image_urls": urls, "image_url": urls["card"]}))
+            except Exception as e:
+                self._update(job_id, status=DONE, message=f"Image upload failed: {e}")
+                return
+
+        self._update(job_id, status=DONE)
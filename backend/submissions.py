@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pandas as pd
+
+# -------------------------------------------------
+# EVENT SUBMISSION RULES (shared by the form and bulk_import.py)
+# -------------------------------------------------
+INVALID_TIME_MSG = "Invalid date or time format."
+END_BEFORE_START_MSG = "End time cannot be earlier than the start time."
+ADDRESS_NOT_FOUND_MSG = "Could not find this address. Please check spelling or add city name."
+MISSING_FIELDS_MSG = "Missing required field(s): {fields}."
+
+TEXT_FIELDS = ("product_name", "brand_id", "store_name", "address", "city", "description")
+
+# Bulk rows: every one of these must be filled in, times in exactly these formats
+REQUIRED_IMPORT_FIELDS = (
+    "product_name", "store_name", "address", "start_date", "start_time", "end_date", "end_time",
+)
+IMPORT_DATE_FORMAT = "%Y-%m-%d"
+IMPORT_TIME_FORMAT = "%H:%M"
+
+
+class SubmissionError(ValueError):
+    """A submission that breaks one of the rules above (message is user-facing)."""
+
+
+def parse_event_times(start_date, start_str, end_date, end_str):
+    """Combine date + "HH:MM" parts into (start_dt, end_dt) Timestamps, or raise."""
+    if any(not str(part or "").strip() for part in (start_date, start_str, end_date, end_str)):
+        raise SubmissionError(INVALID_TIME_MSG)
+
+    start_dt = pd.to_datetime(f"{start_date} {start_str}", errors="coerce")
+    end_dt = pd.to_datetime(f"{end_date} {end_str}", errors="coerce")
+
+    if start_dt is None or end_dt is None or pd.isna(start_dt) or pd.isna(end_dt):
+        raise SubmissionError(INVALID_TIME_MSG)
+
+    if end_dt < start_dt:
+        raise SubmissionError(END_BEFORE_START_MSG)
+
+    return start_dt, end_dt
+
+
+def parse_import_row(row):
+    """Strict checks for a bulk-import row (stripped strings) → (start_dt, end_dt), or raise.
+
+    Unlike the form, free-form dates are not guessed at: "03.04.2026"
+    would otherwise silently become March 4, and a blank date year 1.
+    """
+    missing = [k for k in REQUIRED_IMPORT_FIELDS if not row.get(k)]
+    if missing:
+        raise SubmissionError(MISSING_FIELDS_MSG.format(fields=", ".join(missing)))
+
+    fmt = f"{IMPORT_DATE_FORMAT} {IMPORT_TIME_FORMAT}"
+    try:
+        start_dt = datetime.strptime(f"{row['start_date']} {row['start_time']}", fmt)
+        end_dt = datetime.strptime(f"{row['end_date']} {row['end_time']}", fmt)
+    except ValueError:
+        raise SubmissionError(INVALID_TIME_MSG) from None
+
+    if end_dt < start_dt:
+        raise SubmissionError(END_BEFORE_START_MSG)
+
+    return pd.Timestamp(start_dt), pd.Timestamp(end_dt)
+
+
+def build_event_doc(fields, start_dt, end_dt, coords, approved=False):
+    """Firestore document for a validated, geocoded submission."""
+    if not coords:
+        raise SubmissionError(ADDRESS_NOT_FOUND_MSG)
+
+    lat, lon = coords
+    doc = {k: fields.get(k, "") for k in TEXT_FIELDS}
+    doc.update(
+        {
+            "latitude": lat,
+            "longitude": lon,
+            "start_time": start_dt.to_pydatetime(),
+            "end_time": end_dt.to_pydatetime(),
+            "approved": approved,
+        }
+    )
+    return doc
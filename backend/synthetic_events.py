@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from normalize import LEGACY_FORMAT
+
+# -------------------------------------------------
+# SYNTHETIC EVENTS (benchmarks and the offline "fake" backend)
+# -------------------------------------------------
+# (city, lat, lon, weight) — rough population weights
+CITIES = [
+    ("Helsinki", 60.1699, 24.9384, 10), ("Espoo", 60.2055, 24.6559, 5),
+    ("Tampere", 61.4978, 23.7610, 4), ("Vantaa", 60.2934, 25.0378, 4),
+    ("Oulu", 65.0121, 25.4651, 3), ("Turku", 60.4518, 22.2666, 3),
+    ("Jyväskylä", 62.2426, 25.7473, 2), ("Lahti", 60.9827, 25.6612, 2),
+    ("Kuopio", 62.8924, 27.6770, 2), ("Pori", 61.4851, 21.7974, 1),
+    ("Joensuu", 62.6010, 29.7636, 1), ("Lappeenranta", 61.0587, 28.1887, 1),
+    ("Vaasa", 63.0951, 21.6165, 1), ("Rovaniemi", 66.5039, 25.7294, 1),
+    ("Seinäjoki", 62.7903, 22.8403, 1), ("Hämeenlinna", 60.9929, 24.4590, 1),
+]
+STORES = ["K-Citymarket", "K-Supermarket", "Prisma", "S-market", "Lidl", "Alepa", "Tokmanni"]
+BRANDS = ["Valio", "Fazer", "Oatly", "Arla", "Paulig", "Atria", "HK", "Pirkka", "Hartwall", "Panda"]
+PRODUCTS = ["kahvi", "kaurajogurtti", "suklaa", "juusto", "mehu", "leipä", "makkara", "jäätelö"]
+
+
+def make_events(n, seed=0, now=None):
+    """n realistic-looking event dicts, warts included.
+
+    ~25% legacy "%Y-%m-%d %H:%M" string times, ~2% other string formats,
+    ~30% without an image, ~3% with missing or junk coordinates, ~90%
+    approved, times from two weeks ago to two months ahead.
+    """
+    rng = np.random.default_rng(seed)
+    now = now or datetime.now().replace(minute=0, second=0, microsecond=0)
+
+    weights = np.array([c[3] for c in CITIES], dtype=float)
+    city_idx = rng.choice(len(CITIES), size=n, p=weights / weights.sum())
+    start_offsets = rng.integers(-14 * 24, 60 * 24, size=n)      # hours
+    durations = rng.choice([2, 3, 4, 6, 8, 24, 72], size=n)      # hours
+    time_kind = rng.random(n)
+    image_kind = rng.random(n)
+    coord_kind = rng.random(n)
+    jitter = rng.normal(0, 0.04, size=(n, 2))
+
+    events = []
+    for i in range(n):
+        city, lat, lon, _ = CITIES[city_idx[i]]
+        brand = BRANDS[rng.integers(len(BRANDS))]
+        product = PRODUCTS[rng.integers(len(PRODUCTS))]
+
+        start = now + timedelta(hours=int(start_offsets[i]))
+        end = start + timedelta(hours=int(durations[i]))
+        if time_kind[i] < 0.25:
+            start, end = start.strftime(LEGACY_FORMAT), end.strftime(LEGACY_FORMAT)
+        elif time_kind[i] < 0.27:
+            start, end = start.isoformat(), end.isoformat()
+
+        if coord_kind[i] < 0.01:
+            latitude, longitude = None, None
+        elif coord_kind[i] < 0.02:
+            latitude, longitude = "", "abc"
+        elif coord_kind[i] < 0.03:
+            latitude, longitude = "nan", 999
+        else:
+            latitude, longitude = lat + jitter[i, 0], lon + jitter[i, 1]
+
+        event = {
+            "id": f"ev{i:07d}",
+            "product_name": f"{brand} {product}",
+            "brand_id": brand,
+            "store_name": STORES[rng.integers(len(STORES))],
+            "address": f"Testikatu {int(rng.integers(1, 200))}",
+            "city": city,
+            "description": f"Maistiaisia: {product}, tervetuloa!",
+            "latitude": latitude,
+            "longitude": longitude,
+            "start_time": start,
+            "end_time": end,
+            "approved": bool(rng.random() < 0.9),
+        }
+        if image_kind[i] >= 0.3:
+            base = f"https://storage.googleapis.com/bench/events/{event['id']}"
+            event["image_urls"] = {"thumb": f"{base}/thumb.webp", "card": f"{base}/card.webp"}
+            event["image_url"] = event["image_urls"]["card"]
+        elif image_kind[i] >= 0.25:
+            event["image_url"] = "undefined"
+        events.append(event)
+
+    return events
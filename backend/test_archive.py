@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from archive import archive_cutoff, archive_expired, archive_stats, read_archive_collection, read_archive_file
+from fake_firestore import FakeFirestore
+
+# -------------------------------------------------
+# Archival of expired events, on FakeFirestore
+# -------------------------------------------------
+CUTOFF = datetime(2026, 9, 18)
+
+
+def seeded_db(expired=5, current=3):
+    db = FakeFirestore()
+    col = db.collection("events")
+    for i in range(expired):
+        col.document(f"old{i}").set({"brand_id": "Valio", "city": "Oulu", "end_time": CUTOFF - timedelta(days=i + 1)})
+    for i in range(current):
+        col.document(f"new{i}").set({"brand_id": "Paulig", "city": "Turku", "end_time": CUTOFF + timedelta(days=i)})
+    return db
+
+
+def remaining(db):
+    return sorted(s.id for s in db.collection("events").stream())
+
+
+def test_cutoff_is_midnight_retention_days_ago():
+    assert archive_cutoff(30, now=datetime(2026, 10, 18, 15, 42)) == datetime(2026, 9, 18)
+
+
+def test_archive_to_collection_in_chunks():
+    db = seeded_db()
+
+    assert archive_expired(db, CUTOFF, chunk=2) == 5
+    assert remaining(db) == ["new0", "new1", "new2"]
+
+    archived = list(read_archive_collection(db))
+    assert sorted(e["id"] for e in archived) == [f"old{i}" for i in range(5)]
+    assert all("archived_at" in e for e in archived)
+    assert archive_expired(db, CUTOFF) == 0
+
+
+def test_dry_run_only_counts():
+    db = seeded_db()
+    assert archive_expired(db, CUTOFF, dry_run=True) == 5
+    assert len(remaining(db)) == 8
+
+
+def test_archive_to_file_keeps_odd_fields_as_text(tmp_path):
+    db = seeded_db(expired=2)
+    db.collection("events").document("old0").set({"end_time": CUTOFF - timedelta(days=3), "raw": b"\x01"})
+    path = str(tmp_path / "archive.jsonl.gz")
+
+    assert archive_expired(db, CUTOFF, archive_path=path) == 2
+    archived = {e["id"]: e for e in read_archive_file(path)}
+    assert set(archived) == {"old0", "old1"}
+    assert isinstance(archived["old0"]["raw"], str)
+    assert remaining(db) == ["new0", "new1", "new2"]
+
+
+def test_archive_stats():
+    db = seeded_db()
+    archive_expired(db, CUTOFF)
+    stats = archive_stats(read_archive_collection(db))
+
+    assert stats["total"] == 5
+    assert stats["per_brand"] == {"Valio": 5}
+    assert sum(stats["per_month"].values()) == 5
@@ -0,0 +1,83 @@
+import json
+
+import requests
+
+from bulk_import import import_rows, read_rows
+from fake_firestore import FakeFirestore
+
+# -------------------------------------------------
+# Bulk import: validation, geocoding errors and writes, on FakeFirestore
+# -------------------------------------------------
+
+
+class StubGeocoder:
+    """Known addresses → coords; `down` addresses raise until `fail_times` calls used up."""
+
+    def __init__(self, known, down=(), fail_times=99):
+        self.known = known
+        self.down = set(down)
+        self.fail_times = fail_times
+        self.calls = []
+
+    def geocode(self, address, city):
+        self.calls.append(address)
+        if address in self.down and self.calls.count(address) <= self.fail_times:
+            raise requests.ConnectionError("Nominatim unreachable")
+        return self.known.get(address)
+
+
+def row(address, **overrides):
+    base = {
+        "product_name": "Kahvi", "store_name": "Prisma", "address": address, "city": "Oulu",
+        "start_date": "2026-10-20", "start_time": "10:00", "end_date": "2026-10-20", "end_time": "14:00",
+    }
+    base.update(overrides)
+    return base
+
+
+def test_import_separates_misses_from_geocoder_errors():
+    db = FakeFirestore()
+    geocoder = StubGeocoder({"Kauppakatu 1": (65.01, 25.47)}, down={"Asemakatu 2"})
+    rows = [
+        (2, row("Kauppakatu 1")),
+        (3, row("Nowhere 9")),
+        (4, row("Asemakatu 2")),
+        (5, row("Kauppakatu 1", start_date="20.10.2026")),
+    ]
+
+    report = import_rows(rows, db, geocoder, retries=2, backoff=0)
+
+    assert report["written"] == 1
+    assert [line for line, _ in report["failed"]] == [3, 5]
+    assert [line for line, _ in report["geocode_errors"]] == [4]
+    assert geocoder.calls.count("Asemakatu 2") == 2
+    assert len(list(db.collection("events").stream())) == 1
+
+
+def test_import_retries_transient_errors():
+    geocoder = StubGeocoder({"Asemakatu 2": (65.0, 25.5)}, down={"Asemakatu 2"}, fail_times=1)
+
+    report = import_rows([(2, row("Asemakatu 2"))], FakeFirestore(), geocoder, retries=3, backoff=0)
+
+    assert report["written"] == 1
+    assert report["geocode_errors"] == [] and report["failed"] == []
+
+
+def test_dry_run_writes_nothing():
+    db = FakeFirestore()
+    geocoder = StubGeocoder({"Kauppakatu 1": (65.01, 25.47)})
+
+    report = import_rows([(2, row("Kauppakatu 1"))], db, geocoder, dry_run=True)
+
+    assert report["valid"] == 1 and report["written"] == 0
+    assert list(db.collection("events").stream()) == []
+
+
+def test_read_rows_reports_bad_jsonl_lines(tmp_path):
+    path = tmp_path / "schedule.jsonl"
+    path.write_text(json.dumps(row("Kauppakatu 1")) + "\n{oops\n\n[1, 2]\n", encoding="utf-8")
+
+    report = import_rows(read_rows(str(path)), FakeFirestore(), StubGeocoder({"Kauppakatu 1": (65.0, 25.5)}))
+
+    assert report["written"] == 1
+    assert [line for line, _ in report["failed"]] == [2, 4]
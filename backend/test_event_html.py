@@ -0,0 +1,77 @@
+from event_html import HtmlCache, cached_popup_html, card_html, html_cache, popup_html
+
+# -------------------------------------------------
+# Card / popup HTML and its memoization
+# -------------------------------------------------
+HOSTILE = {
+    "product_name": "<script>alert(1)</script>",
+    "brand_id": "<b onmouseover=alert(1)>",
+    "store_name": "Alepa & Co",
+    "address": "Kauppakatu \"3\"",
+    "city": "<i>Oulu</i>",
+    "description": "<img src=x onerror=alert(1)>",
+}
+
+
+def test_popup_and_card_escape_text_fields():
+    for html in (popup_html(HOSTILE), card_html(HOSTILE, "OK")):
+        assert "<script>" not in html
+        assert "<img src=x" not in html
+        assert "<b onmouseover" not in html
+        assert "<i>Oulu</i>" not in html
+        assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+        assert "Alepa &amp; Co" in html
+        assert "Kauppakatu &quot;3&quot;" in html
+
+
+def test_only_http_image_urls_are_embedded():
+    for url in ("javascript:alert(1)", "data:text/html,<script>", "httpx://a", None):
+        assert "<img" not in popup_html({"image_url": url})
+        assert "<img" not in card_html({"image_url": url}, "OK")
+
+    html = popup_html({"image_url": 'https://cdn.example/a.webp" onerror="alert(1)'})
+    assert 'src="https://cdn.example/a.webp&quot; onerror=&quot;alert(1)"' in html
+
+
+def test_missing_fields_render_empty():
+    assert "None" not in popup_html({"product_name": None})
+
+
+# ---------- HTML cache ----------
+def test_html_cache_renders_once_and_evicts_lru():
+    cache = HtmlCache(maxsize=2)
+    renders = []
+
+    def render(text):
+        renders.append(text)
+        return f"<p>{text}</p>"
+
+    assert cache.get_or_render("a", lambda: render("a")) == "<p>a</p>"
+    assert cache.get_or_render("a", lambda: render("a")) == "<p>a</p>"
+    cache.get_or_render("b", lambda: render("b"))
+    cache.get_or_render("a", lambda: render("a"))           # "b" is now least recent
+    cache.get_or_render("c", lambda: render("c"))
+    cache.get_or_render("b", lambda: render("b"))
+
+    assert renders == ["a", "b", "c", "b"]
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
+
+
+def test_cached_popup_follows_content_hash_and_lang():
+    html_cache.clear()
+    event = {"id": "e1", "content_hash": 1, "product_name": "Kahvi"}
+
+    first = cached_popup_html(event, "fi")
+    assert cached_popup_html(dict(event, product_name="Tee"), "fi") == first     # same version
+    assert "Tee" in cached_popup_html(dict(event, product_name="Tee", content_hash=2), "fi")
+    cached_popup_html(event, "en")
+    assert html_cache.misses == 3
+
+    # No id/hash: rendered every time, never cached
+    assert "Tee" in cached_popup_html({"product_name": "Tee"}, "fi")
+    assert len(html_cache) == 3
+    html_cache.clear()
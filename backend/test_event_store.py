@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from event_store import BatchWriteError, EventSnapshot, commit_in_batches, fetch_public_events
+from fake_firestore import FakeFirestore
+
+# -------------------------------------------------
+# Shared event snapshot, the public query and batched writes, on FakeFirestore
+# -------------------------------------------------
+
+
+class CountingLoader:
+    """Returns the current `docs` list and counts how often it was asked."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [dict(d) for d in self.docs]
+
+
+def test_snapshot_loads_once_within_ttl():
+    loader = CountingLoader([{"id": "a"}, {"id": "b"}])
+    snapshot = EventSnapshot(loader, ttl_seconds=60)
+
+    assert {d["id"] for d in snapshot.docs()} == {"a", "b"}
+    snapshot.docs()
+    snapshot.frame()
+    assert loader.calls == 1
+
+
+def test_snapshot_reloads_after_ttl():
+    loader = CountingLoader([{"id": "a"}])
+    snapshot = EventSnapshot(loader, ttl_seconds=0)
+
+    snapshot.docs()
+    loader.docs = [{"id": "a"}, {"id": "c"}]
+    snapshot._loaded_at -= 1
+    assert {d["id"] for d in snapshot.docs()} == {"a", "c"}
+    assert loader.calls == 2
+
+
+def test_prepare_runs_once_per_version():
+    prepared = []
+
+    def prepare(df):
+        prepared.append(len(df))
+        return df.assign(n=range(len(df)))
+
+    snapshot = EventSnapshot(CountingLoader([{"id": "a"}, {"id": "b"}]), prepare=prepare)
+    snapshot.frame()
+    snapshot.frame()
+    assert prepared == [2]
+    assert list(snapshot.frame()["n"]) == [0, 1]
+
+
+def test_derived_is_built_for_the_held_view():
+    snapshot = EventSnapshot(CountingLoader([{"id": "a"}, {"id": "b"}]))
+    builds = []
+
+    def ids(frame):
+        builds.append(1)
+        return list(frame["id"])
+
+    view = snapshot.view()
+    assert snapshot.derived("ids", ids, view) == ["a", "b"]
+    assert snapshot.derived("ids", ids, view) == ["a", "b"]
+    assert len(builds) == 1
+
+    # The snapshot moves on; each view still gets ids for its own frame
+    snapshot.remove("a")
+    current = snapshot.view()
+    assert snapshot.derived("ids", ids, current) == ["b"]
+    assert snapshot.derived("ids", ids, view) == ["a", "b"]
+    assert snapshot.derived("ids", ids, current) == ["b"]
+    assert len(builds) == 3
+
+
+def test_remove_and_invalidate():
+    loader = CountingLoader([{"id": "a"}, {"id": "b"}])
+    snapshot = EventSnapshot(loader)
+
+    version = snapshot.view()[0]
+    snapshot.remove("a")
+    snapshot.remove("missing")
+    assert [d["id"] for d in snapshot.docs()] == ["b"]
+    assert snapshot.version == version + 1
+    assert loader.calls == 1
+
+    snapshot.invalidate()
+    assert {d["id"] for d in snapshot.docs()} == {"a", "b"}
+    assert loader.calls == 2
+
+
+def test_fetch_public_events_filters_and_pages():
+    db = FakeFirestore()
+    col = db.collection("events")
+    since = datetime(2026, 10, 1)
+    for i in range(7):
+        col.document(f"ok{i}").set({"approved": True, "end_time": since + timedelta(hours=i)})
+    col.document("pending").set({"approved": False, "end_time": since + timedelta(days=1)})
+    col.document("ended").set({"approved": True, "end_time": since - timedelta(hours=1)})
+    col.document("legacy").set({"approved": True, "end_time": "2026-10-02 12:00"})
+
+    docs = fetch_public_events(db, since, page_size=3)
+    assert sorted(d["id"] for d in docs) == [f"ok{i}" for i in range(7)]
+
+
+# ---------- batched writes ----------
+class CountingFirestore(FakeFirestore):
+    """FakeFirestore that records the size of every committed batch."""
+
+    def __init__(self, fail_on=None):
+        super().__init__()
+        self.commits = []
+        self.fail_on = fail_on
+
+    def batch(self):
+        batch = super().batch()
+        commit = batch.commit
+
+        def counted():
+            if len(self.commits) == self.fail_on:
+                raise RuntimeError("deadline exceeded")
+            self.commits.append(len(batch._ops))
+            return commit()
+
+        batch.commit = counted
+        return batch
+
+
+def test_commit_in_batches_chunks():
+    db = CountingFirestore()
+    col = db.collection("events")
+    writes = (("set", col.document(f"e{i}"), {"n": i}) for i in range(1201))
+
+    assert commit_in_batches(db, writes, batch_size=500) == 1201
+    assert db.commits == [500, 500, 201]
+    assert len(list(col.stream())) == 1201
+
+
+def test_commit_in_batches_reports_committed_on_failure():
+    db = CountingFirestore(fail_on=1)
+    col = db.collection("events")
+    writes = [("set", col.document(f"e{i}"), {"n": i}) for i in range(1201)]
+
+    with pytest.raises(BatchWriteError) as err:
+        commit_in_batches(db, writes, batch_size=500)
+    assert err.value.committed == 500
+    assert len(list(col.stream())) == 500
+
+
+def test_commit_in_batches_rejects_unknown_op():
+    db = FakeFirestore()
+    with pytest.raises(ValueError):
+        commit_in_batches(db, [("upsert", db.collection("events").document("x"), {})])
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from facets import FacetIndex
+from normalize import normalize_events
+
+# -------------------------------------------------
+# Filter facets over a normalized frame
+# -------------------------------------------------
+
+
+def facet_frame():
+    return normalize_events(pd.DataFrame([
+        {"id": "a", "brand_id": "Valio", "store_name": "Prisma", "city": "Oulu",
+         "start_time": "2026-10-20 10:00", "end_time": "2026-10-20 14:00"},
+        {"id": "b", "brand_id": "Valio", "store_name": "Alepa", "city": "Helsinki",
+         "start_time": "2026-10-18 10:00", "end_time": "2026-10-18 12:00"},
+        {"id": "c", "brand_id": "Paulig", "store_name": "Prisma", "city": "Oulu",
+         "start_time": "2026-10-22 10:00", "end_time": "2026-10-23 12:00"},
+        {"id": "d", "brand_id": "", "store_name": None, "city": "Oulu",
+         "start_time": None, "end_time": None},
+    ]))
+
+
+def test_values_and_totals():
+    index = FacetIndex(facet_frame())
+
+    assert index.values["brand_id"] == ["Paulig", "Valio"]
+    assert index.totals["brand_id"] == {"Paulig": 1, "Valio": 2}
+    assert index.totals["city"] == {"Helsinki": 1, "Oulu": 3}
+    assert index.codes["store_name"][3] == -1                 # missing value
+    assert (index.min_date.isoformat(), index.max_date.isoformat()) == ("2026-10-18", "2026-10-23")
+
+
+def test_restrict_and_counts_for_a_selection():
+    index = FacetIndex(facet_frame())
+    everything = np.arange(index.size)
+
+    oulu = index.restrict(everything, "city", "Oulu")
+    assert index.ids[oulu].tolist() == ["a", "c", "d"]
+    assert index.counts("brand_id", oulu) == {"Paulig": 1, "Valio": 1}
+
+    assert index.restrict(oulu, "brand_id", "").tolist() == oulu.tolist()
+    assert index.restrict(oulu, "brand_id", "Unknown").tolist() == []
+
+
+def test_positions_of_ignores_unknown_ids():
+    index = FacetIndex(facet_frame())
+    assert index.positions_of({"c", "a", "zz"}).tolist() == [0, 2]
+
+
+def test_empty_frame():
+    index = FacetIndex(pd.DataFrame())
+    assert index.size == 0
+    assert index.totals["brand_id"] == {}
+    assert index.min_date is None and index.max_date is None
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+import requests
+
+from geocoding import GeocodeCache, Geocoder, TokenBucket
+
+# -------------------------------------------------
+# Geocoding cache and rate limiter, no network needed
+# -------------------------------------------------
+
+
+class StubBackend:
+    """Answers from a dict; raises for addresses listed in `fail`."""
+
+    def __init__(self, answers, fail=()):
+        self.answers = answers
+        self.fail = set(fail)
+        self.calls = []
+
+    def search(self, address, city):
+        self.calls.append((address, city))
+        if address in self.fail:
+            raise requests.ConnectionError("offline")
+        return self.answers.get(address)
+
+
+class NoWait:
+    def acquire(self):
+        pass
+
+
+def make_geocoder(backend):
+    return Geocoder(backend=backend, cache=GeocodeCache(":memory:"), limiter=NoWait())
+
+
+def test_geocoder_caches_hits_by_normalized_key():
+    backend = StubBackend({"Mannerheimintie 1": (60.17, 24.94)})
+    geocoder = make_geocoder(backend)
+
+    assert geocoder.geocode("Mannerheimintie 1", "Helsinki") == (60.17, 24.94)
+    assert geocoder.geocode("  mannerheimintie 1,", "HELSINKI") == (60.17, 24.94)
+    assert len(backend.calls) == 1
+
+
+def test_geocoder_caches_misses():
+    backend = StubBackend({})
+    geocoder = make_geocoder(backend)
+
+    assert geocoder.geocode("Nowhere 9", "Oulu") is None
+    assert geocoder.geocode("Nowhere 9", "Oulu") is None
+    assert len(backend.calls) == 1
+
+
+def test_geocoder_misses_expire_with_negative_ttl():
+    backend = StubBackend({})
+    geocoder = Geocoder(backend=backend, cache=GeocodeCache(":memory:", negative_ttl=0), limiter=NoWait())
+
+    geocoder.geocode("Nowhere 9", "Oulu")
+    time.sleep(0.01)
+    geocoder.geocode("Nowhere 9", "Oulu")
+    assert len(backend.calls) == 2
+
+
+def test_geocoder_does_not_cache_network_errors():
+    backend = StubBackend({"Kauppakatu 3": (62.24, 25.75)}, fail={"Kauppakatu 3"})
+    geocoder = make_geocoder(backend)
+
+    with pytest.raises(requests.ConnectionError):
+        geocoder.geocode("Kauppakatu 3", "Jyväskylä")
+
+    backend.fail.clear()
+    assert geocoder.geocode("Kauppakatu 3", "Jyväskylä") == (62.24, 25.75)
+    assert len(backend.calls) == 2
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=20.0, capacity=2)
+
+    start = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    burst = time.monotonic() - start
+    bucket.acquire()
+    total = time.monotonic() - start
+
+    assert burst < 0.04
+    assert total >= 0.04
@@ -0,0 +1,56 @@
+import io
+
+from PIL import Image, ImageCms
+
+from images import VARIANTS, decode_image, make_variants
+
+# -------------------------------------------------
+# Upload decoding and WebP variants
+# -------------------------------------------------
+
+
+def encode(img, fmt="PNG", **params):
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **params)
+    return buf.getvalue()
+
+
+def test_transparent_png_is_flattened_onto_white():
+    img = Image.new("RGBA", (4, 4), (255, 0, 0, 0))
+    out = decode_image(encode(img))
+    assert out.mode == "RGB"
+    assert out.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_srgb_profile_is_applied():
+    srgb = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    out = decode_image(encode(Image.new("RGB", (4, 4), (10, 120, 200)), icc_profile=srgb))
+    assert out.mode == "RGB"
+    assert all(abs(a - b) <= 2 for a, b in zip(out.getpixel((0, 0)), (10, 120, 200)))
+
+
+def test_mismatched_profile_falls_back_to_plain_convert():
+    # A grayscale PNG whose profile isn't an RGB one: no transform can be built
+    lab = ImageCms.ImageCmsProfile(ImageCms.createProfile("LAB")).tobytes()
+    out = decode_image(encode(Image.new("L", (4, 4), 128), icc_profile=lab))
+    assert out.mode == "RGB"
+    assert out.getpixel((0, 0)) == (128, 128, 128)
+
+
+def test_broken_profile_falls_back_to_plain_convert():
+    out = decode_image(encode(Image.new("RGB", (4, 4), (1, 2, 3)), icc_profile=b"not a profile"))
+    assert out.getpixel((0, 0)) == (1, 2, 3)
+
+
+def test_variants_are_webp_and_never_upscaled():
+    variants = make_variants(encode(Image.new("RGB", (2000, 1000), (0, 128, 0)), fmt="JPEG"))
+
+    assert set(variants) == set(VARIANTS)
+    for name, data in variants.items():
+        img = Image.open(io.BytesIO(data))
+        max_w, max_h, _ = VARIANTS[name]
+        assert img.format == "WEBP"
+        assert img.width <= max_w and img.height <= max_h
+
+    small = make_variants(encode(Image.new("RGB", (100, 50))))
+    assert Image.open(io.BytesIO(small["card"])).size == (100, 50)
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from interval_index import IntervalIndex
+
+# -------------------------------------------------
+# Interval index for time-window queries
+# -------------------------------------------------
+
+
+def random_intervals(n, seed=0):
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp("2026-10-01")
+    starts = base + pd.to_timedelta(rng.integers(0, 30 * 24, n), unit="h")
+    ends = starts + pd.to_timedelta(rng.integers(0, 72, n), unit="h")
+    starts = pd.Series(starts)
+    ends = pd.Series(ends)
+    starts[::17] = pd.NaT
+    return starts, ends
+
+
+def test_interval_overlapping_matches_brute_force():
+    starts, ends = random_intervals(500)
+    index = IntervalIndex(starts.to_numpy(), ends.to_numpy())
+
+    for t0, t1 in [("2026-10-05", "2026-10-05 06:00"), ("2026-10-20 12:00", "2026-10-25"), ("2026-12-01", "2026-12-02")]:
+        t0, t1 = pd.Timestamp(t0), pd.Timestamp(t1)
+        expected = np.flatnonzero((starts <= t1) & (ends >= t0) & starts.notna() & ends.notna())
+        assert index.overlapping(t0, t1).tolist() == expected.tolist()
+
+
+def test_interval_live_soon_and_days():
+    starts, ends = random_intervals(300, seed=1)
+    index = IntervalIndex(starts.to_numpy(), ends.to_numpy())
+    t = pd.Timestamp("2026-10-10 15:00")
+
+    live = np.flatnonzero((starts <= t) & (ends >= t))
+    assert index.live_at(t).tolist() == live.tolist()
+
+    soon = np.flatnonzero((starts >= t) & (starts <= t + pd.Timedelta(hours=3)))
+    assert index.starting_within(t, 3).tolist() == soon.tolist()
+
+    day_start, day_end = pd.Timestamp("2026-10-12"), pd.Timestamp("2026-10-13") - pd.Timedelta(1, "ns")
+    days = np.flatnonzero((starts <= day_end) & (ends >= day_start))
+    assert index.on_days(datetime(2026, 10, 12).date(), datetime(2026, 10, 12).date()).tolist() == days.tolist()
+
+
+def test_interval_index_empty():
+    index = IntervalIndex([], [])
+    assert len(index) == 0
+    assert index.live_at(datetime(2026, 10, 1)).tolist() == []
@@ -0,0 +1,34 @@
+from lru import LruCache
+
+# -------------------------------------------------
+# Shared LRU (HTML cache, map marker rows)
+# -------------------------------------------------
+
+
+def test_get_or_build_reports_hits():
+    cache = LruCache(maxsize=2)
+    built = []
+
+    def build(key):
+        built.append(key)
+        return key.upper()
+
+    assert cache.get_or_build("a", lambda: build("a")) == ("A", False)
+    assert cache.get_or_build("a", lambda: build("a")) == ("A", True)
+    assert built == ["a"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_is_evicted():
+    cache = LruCache(maxsize=2)
+    cache.get_or_build("a", lambda: 1)
+    cache.get_or_build("b", lambda: 2)
+    cache.get_or_build("a", lambda: 1)
+    cache.get_or_build("c", lambda: 3)
+
+    assert cache.get_or_build("a", lambda: 0) == (1, True)
+    assert cache.get_or_build("b", lambda: 0) == (0, False)
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
@@ -0,0 +1,78 @@
+import contextvars
+import threading
+
+from fake_firestore import FakeFirestore
+from metering import BACKGROUND, SHARED, FirestoreMeter, MeteredFirestore
+
+# -------------------------------------------------
+# Firestore metering over FakeFirestore
+# -------------------------------------------------
+
+
+def metered(n_docs=3):
+    raw = FakeFirestore()
+    for i in range(n_docs):
+        raw.collection("events").document(f"e{i}").set({"n": i})
+    meter = FirestoreMeter()
+    return MeteredFirestore(raw, meter), meter
+
+
+def in_session(meter, session_id, fn):
+    """Run fn() as one rerun of session_id, in its own context (like a script thread)."""
+    def rerun():
+        usage = meter.start_rerun(session_id)
+        fn()
+        return usage
+
+    return contextvars.Context().run(rerun)
+
+
+def test_reads_and_writes_are_charged_to_the_session():
+    db, meter = metered()
+    col = db.collection("events")
+
+    usage = in_session(meter, "s1", lambda: (list(col.stream()), col.document("e0").get(), col.document("x").set({})))
+    in_session(meter, "s2", lambda: list(col.where("n", "==", 99).stream()))
+
+    assert (usage.reads, usage.writes) == (4, 1)
+    assert meter.session("s1").reads == 4
+    assert meter.session("s2").reads == 1            # an empty result is billed as one read
+    assert meter.total.reads == 5 and meter.total.writes == 1
+
+
+def test_shared_loads_and_background_threads():
+    db, meter = metered()
+    col = db.collection("events")
+
+    def rerun():
+        with meter.shared():
+            list(col.stream())
+
+    usage = in_session(meter, "s1", rerun)
+    thread = threading.Thread(target=lambda: col.document("e1").get())
+    thread.start()
+    thread.join()
+
+    assert usage.reads == 3                          # still part of this rerun's cost
+    assert meter.session("s1").reads == 0
+    assert meter.session(SHARED).reads == 3
+    assert meter.session(BACKGROUND).reads == 1
+
+
+def test_batches_count_on_commit_and_budget():
+    db, meter = metered(0)
+    col = db.collection("events")
+
+    def rerun():
+        batch = db.batch()
+        for i in range(3):
+            batch.set(col.document(f"b{i}"), {"n": i})
+        batch.commit()
+        list(col.stream())
+
+    in_session(meter, "s1", rerun)
+
+    assert meter.session("s1").writes == 3
+    assert meter.over_budget("s1", 3) and not meter.over_budget("s1", 4)
+    assert not meter.over_budget("s1", 0)
+    assert "maistiaiset_firestore_reads_total 3" in meter.to_prometheus()
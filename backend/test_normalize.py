@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from normalize import normalize_events, to_datetime64
+
+# -------------------------------------------------
+# Vectorized time parsing and event normalization
+# -------------------------------------------------
+
+
+def test_to_datetime64_mixed_inputs():
+    col = pd.Series([
+        datetime(2026, 10, 3, 12, 0, tzinfo=timezone.utc),    # Firestore timestamp
+        datetime(2026, 10, 3, 13, 30),                        # naive datetime
+        "2026-10-04 09:15",                                   # legacy format
+        "4.10.2026 10:00",                                    # anything else
+        "",
+        None,
+        "not a time",
+    ])
+    out = to_datetime64(col)
+
+    assert out.dtype == "datetime64[ns]"
+    assert out[0] == pd.Timestamp("2026-10-03 12:00")      # wall clock kept, tz dropped
+    assert out[1] == pd.Timestamp("2026-10-03 13:30")
+    assert out[2] == pd.Timestamp("2026-10-04 09:15")
+    assert out[3].date() in (datetime(2026, 10, 4).date(), datetime(2026, 4, 10).date())
+    assert out[4:].isna().all()
+
+
+def test_to_datetime64_keeps_index():
+    col = pd.Series(["2026-10-04 09:15", None], index=[10, 20])
+    assert list(to_datetime64(col).index) == [10, 20]
+
+
+def test_normalize_events_columns():
+    df = pd.DataFrame([
+        {"id": "a", "start_time": "2026-10-04 09:15", "end_time": datetime(2026, 10, 4, 15, 0),
+         "latitude": "60.17", "longitude": 24.94, "product_name": "Kahvi"},
+        {"id": "b", "start_time": None, "latitude": "x", "product_name": "Juusto"},
+    ])
+    out = normalize_events(df)
+
+    assert out.loc[0, "start_fmt"] == "04-10-2026 09:15"
+    assert out.loc[0, "end_fmt"] == "04-10-2026 15:00"
+    assert out.loc[0, "start_date_clean"] == pd.Timestamp("2026-10-04")
+    assert out.loc[0, "lat_clean"] == 60.17 and out.loc[0, "lon_clean"] == 24.94
+    assert out.loc[1, "start_fmt"] == "" and pd.isna(out.loc[1, "end_dt"])
+    assert pd.isna(out.loc[1, "lat_clean"])
+    assert "start_dt" not in df                             # input left alone
+
+
+def test_content_hash_follows_displayed_fields():
+    df = pd.DataFrame([{"id": "a", "product_name": "Kahvi", "approved": True}])
+    before = normalize_events(df)["content_hash"][0]
+
+    assert normalize_events(df.assign(approved=False))["content_hash"][0] == before
+    assert normalize_events(df.assign(product_name="Tee"))["content_hash"][0] != before
+
+
+def test_normalize_events_empty():
+    assert normalize_events(pd.DataFrame()).empty
+    assert normalize_events(None) is None
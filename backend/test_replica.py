@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fake_firestore import FakeFirestore
+from replica import EventReplica
+
+# -------------------------------------------------
+# SQLite read replica, synced from FakeFirestore / a stub listener
+# -------------------------------------------------
+SINCE = datetime(2026, 10, 1)
+
+
+def event(approved=True, end=datetime(2026, 10, 5, 12, 0), **fields):
+    return {"approved": approved, "start_time": end.replace(hour=8), "end_time": end, **fields}
+
+
+def seeded_db():
+    db = FakeFirestore()
+    col = db.collection("events")
+    col.document("live").set(event(product_name="Kahvi"))
+    col.document("pending").set(event(approved=False))
+    col.document("ended").set(event(end=datetime(2026, 9, 1)))
+    col.document("legacy").set({**event(), "end_time": "2026-10-02 12:00"})
+    return db
+
+
+def test_sync_full_and_public_events():
+    replica = EventReplica(":memory:")
+    assert replica.sync_full(seeded_db(), page_size=2) == 4
+
+    docs = replica.public_events(SINCE)
+    assert [d["id"] for d in docs] == ["legacy", "live"]
+    live = docs[1]
+    assert live["product_name"] == "Kahvi"
+    assert live["end_time"] == datetime(2026, 10, 5, 12, 0, tzinfo=timezone.utc)
+    assert replica.synced_at() is not None
+
+
+def test_sync_full_drops_docs_deleted_upstream():
+    db = seeded_db()
+    replica = EventReplica(":memory:")
+    replica.sync_full(db)
+
+    db.collection("events").document("live").delete()
+    replica.sync_full(db)
+    assert replica.get("live") is None
+    assert len(replica) == 3
+
+
+def test_write_through_update_and_remove():
+    replica = EventReplica(":memory:")
+    replica.sync_full(seeded_db())
+
+    replica.update("pending", {"approved": True})
+    replica.update("missing", {"approved": True})
+    assert "pending" in {d["id"] for d in replica.public_events(SINCE)}
+    assert replica.get("missing") is None
+
+    replica.remove("pending")
+    assert replica.get("pending") is None
+
+
+# ---------- snapshot listener ----------
+def change(kind, doc_id, data=None):
+    document = SimpleNamespace(id=doc_id, to_dict=lambda: dict(data or {}))
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+
+def test_first_callback_prunes_and_odd_fields_do_not_stop_the_listener():
+    replica = EventReplica(":memory:")
+    replica.upsert("gone", event())
+    replica._watch_fresh = True
+
+    odd = event(location=SimpleNamespace(latitude=65.0), raw=b"\x00")
+    docs = [SimpleNamespace(id="a"), SimpleNamespace(id="odd")]
+    replica._on_snapshot(docs, [change("ADDED", "a", event()), change("ADDED", "odd", odd)], None)
+
+    assert replica.get("gone") is None
+    assert isinstance(replica.get("odd")["raw"], str)
+    assert len(replica) == 2
+
+    # Later callbacks only apply their changes
+    replica._on_snapshot([], [change("REMOVED", "a"), change("MODIFIED", "odd", event(approved=False))], None)
+    assert replica.get("a") is None
+    assert replica.get("odd")["approved"] is False
+
+
+def test_dead_listener_is_replaced_after_a_full_sync():
+    db = seeded_db()
+    replica = EventReplica(":memory:")
+    replica._watch = SimpleNamespace(is_active=False)
+
+    replica.ensure_synced(db, max_age=3600)
+
+    assert replica._watch is None                  # FakeFirestore has no listeners
+    assert len(replica) == 4
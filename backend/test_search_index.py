@@ -0,0 +1,50 @@
+import pandas as pd
+
+from search_index import SearchIndex, fold
+
+# -------------------------------------------------
+# Full-text search index
+# -------------------------------------------------
+
+
+def search_frame(rows):
+    return pd.DataFrame(rows, columns=["id", "content_hash", "product_name", "brand_id", "store_name", "description"])
+
+
+def test_fold_strips_diacritics_and_case():
+    assert fold("Kähvi") == fold("KAHVI") == "kahvi"
+    assert fold(None) == ""
+
+
+def test_search_prefix_and_words():
+    index = SearchIndex()
+    index.sync(1, search_frame([
+        ("a", "h1", "Kaurajogurtti", "Oatly", "Prisma Kamppi", ""),
+        ("b", "h2", "Kahvi", "Paulig", "K-Citymarket", "Tumma paahto"),
+    ]))
+
+    assert index.search("kaura") == {"a"}
+    assert index.search("KÄHVI paah") == {"b"}
+    assert index.search("kahvi oatly") == set()
+    assert index.search("  ") is None
+
+
+def test_search_sync_is_incremental():
+    index = SearchIndex()
+    index.sync(1, search_frame([
+        ("a", "h1", "Kaurajogurtti", "Oatly", "Prisma", ""),
+        ("b", "h2", "Kahvi", "Paulig", "Lidl", ""),
+    ]))
+    # Same version: nothing happens even if the frame differs
+    index.sync(1, search_frame([("c", "h3", "Juusto", "Valio", "Alepa", "")]))
+    assert index.search("juusto") == set()
+
+    # New version: "a" changed, "b" gone, "c" new
+    index.sync(2, search_frame([
+        ("a", "h1b", "Kauramaito", "Oatly", "Prisma", ""),
+        ("c", "h3", "Juusto", "Valio", "Alepa", ""),
+    ]))
+    assert index.search("kaurajog") == set()
+    assert index.search("kauramaito") == {"a"}
+    assert index.search("kahvi") == set()
+    assert index.search("juusto") == {"c"}
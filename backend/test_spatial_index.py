@@ -0,0 +1,29 @@
+import numpy as np
+
+from spatial_index import GridIndex, haversine_km
+
+# -------------------------------------------------
+# Grid index for proximity search
+# -------------------------------------------------
+
+
+def test_grid_query_radius_matches_brute_force():
+    rng = np.random.default_rng(2)
+    lats = rng.uniform(59.8, 60.6, 2000)
+    lons = rng.uniform(24.2, 25.6, 2000)
+    lats[::50] = np.nan
+    grid = GridIndex(lats, lons)
+
+    positions, dist = grid.query_radius(60.17, 24.94, 12)
+
+    all_dist = haversine_km(60.17, 24.94, lats, lons)
+    expected = np.flatnonzero(all_dist <= 12)
+    assert sorted(positions.tolist()) == expected.tolist()
+    assert np.all(np.diff(dist) >= 0)
+    assert np.allclose(dist, all_dist[positions])
+
+
+def test_grid_query_radius_far_away_is_empty():
+    grid = GridIndex([60.17, 61.5], [24.94, 23.76])
+    positions, dist = grid.query_radius(68.66, 27.54, 5)      # Saariselkä
+    assert len(positions) == 0 and len(dist) == 0
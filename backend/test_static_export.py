@@ -0,0 +1,64 @@
+import json
+import os
+
+import pandas as pd
+
+from normalize import normalize_events
+from static_export import MAX_DAYS_PER_EVENT, FolderSink, build_files, publish, select_files
+
+# -------------------------------------------------
+# Static GeoJSON export, written to a temporary folder
+# -------------------------------------------------
+
+
+def export_frame(*rows):
+    base = {"approved": True, "latitude": 60.17, "longitude": 24.94,
+            "start_time": "2026-10-20 10:00", "end_time": "2026-10-20 14:00"}
+    return normalize_events(pd.DataFrame([{**base, **row} for row in rows]))
+
+
+def test_files_split_by_day_and_region():
+    df = export_frame(
+        {"id": "hki", "end_time": "2026-10-21 14:00"},
+        {"id": "oulu", "latitude": 65.01, "longitude": 25.47},
+        {"id": "long", "end_time": "2026-12-31 12:00"},
+        {"id": "nowhere", "latitude": None},
+    )
+    files = build_files(df)
+
+    ids = {key: sorted(f["properties"]["id"] for f in features) for key, features in files.items()}
+    assert ids[("2026-10-20", "r60n24e")] == ["hki", "long"]
+    assert ids[("2026-10-21", "r60n24e")] == ["hki", "long"]
+    assert ids[("2026-10-20", "r65n24e")] == ["oulu"]
+    assert sum("long" in v for v in ids.values()) == MAX_DAYS_PER_EVENT
+    assert not any("nowhere" in v for v in ids.values())
+
+
+def test_folder_publish_writes_plain_geojson_once(tmp_path):
+    sink = FolderSink(str(tmp_path))
+    df = export_frame({"id": "a", "product_name": "<script>alert(1)</script>"})
+
+    manifest = publish(df, sink)
+    assert manifest["written"] == 1
+    (entry,) = manifest["files"]
+    with open(os.path.join(tmp_path, "static/events", entry["path"]), encoding="utf-8") as f:
+        data = json.load(f)
+
+    props = data["features"][0]["properties"]
+    assert "<script>" not in props["popup"]
+    assert "&lt;script&gt;" in props["popup"]
+
+    # Unchanged content keeps its file name and is not written again
+    again = publish(df, sink)
+    assert again["written"] == 0 and again["version"] == manifest["version"]
+
+
+def test_select_files_by_day_and_box():
+    manifest = {"files": [
+        {"day": "2026-10-20", "bbox": [60, 24, 61, 26], "path": "a"},
+        {"day": "2026-10-20", "bbox": [65, 24, 66, 26], "path": "b"},
+        {"day": "2026-10-21", "bbox": [60, 24, 61, 26], "path": "c"},
+    ]}
+    assert [e["path"] for e in select_files(manifest, ["2026-10-20"])] == ["a", "b"]
+    assert [e["path"] for e in select_files(manifest, ["2026-10-20"], (60.1, 24.8, 60.3, 25.1))] == ["a"]
+    assert select_files(None, ["2026-10-20"]) == []
@@ -0,0 +1,88 @@
+import time
+
+import pandas as pd
+
+from fake_firestore import FakeFirestore
+from submission_worker import DONE, FAILED, QUEUED, RUNNING, SubmissionWorker
+from submissions import ADDRESS_NOT_FOUND_MSG
+
+# -------------------------------------------------
+# Background submissions on FakeFirestore (no bucket, stub geocoder)
+# -------------------------------------------------
+FIELDS = {
+    "product_name": "Kahvi", "brand_id": "Paulig", "store_name": "Prisma",
+    "address": "Kauppakatu 1", "city": "Oulu", "description": "",
+}
+START, END = pd.Timestamp("2026-10-20 10:00"), pd.Timestamp("2026-10-20 14:00")
+
+
+class FlakyGeocoder:
+    """Raises for the first `failures` calls, then answers `coords`."""
+
+    def __init__(self, coords, failures=0):
+        self.coords = coords
+        self.failures = failures
+        self.calls = 0
+
+    def geocode(self, address, city):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("Nominatim unreachable")
+        return self.coords
+
+
+def wait_for(worker, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = worker.status(job_id)
+        if job.status not in (QUEUED, RUNNING):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def make_worker(geocoder, db=None):
+    return SubmissionWorker(db or FakeFirestore(), None, geocoder, retries=3, backoff=0)
+
+
+def test_submission_is_written_unapproved():
+    db = FakeFirestore()
+    worker = make_worker(FlakyGeocoder((65.01, 25.47)), db)
+
+    job = wait_for(worker, worker.submit(FIELDS, START, END))
+
+    assert job.status == DONE and job.message == ""
+    doc = db.collection("events").document(job.doc_id).get().to_dict()
+    assert doc["approved"] is False
+    assert (doc["latitude"], doc["longitude"]) == (65.01, 25.47)
+
+
+def test_geocoder_errors_are_retried():
+    geocoder = FlakyGeocoder((65.01, 25.47), failures=2)
+    worker = make_worker(geocoder)
+
+    job = wait_for(worker, worker.submit(FIELDS, START, END))
+
+    assert job.status == DONE
+    assert geocoder.calls == 3
+    assert job.attempts == 4                # 3 geocode tries + 1 write
+
+
+def test_unknown_address_fails_without_retry():
+    geocoder = FlakyGeocoder(None)
+    worker = make_worker(geocoder)
+
+    job = wait_for(worker, worker.submit(FIELDS, START, END))
+
+    assert job.status == FAILED and job.message == ADDRESS_NOT_FOUND_MSG
+    assert geocoder.calls == 1
+
+
+def test_unreachable_geocoder_fails_after_retries():
+    worker = make_worker(FlakyGeocoder((65.0, 25.0), failures=99))
+
+    job = wait_for(worker, worker.submit(FIELDS, START, END))
+
+    assert job.status == FAILED
+    assert job.message.startswith("Submission failed:")
+    assert worker.status("unknown") is None